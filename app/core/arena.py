@@ -0,0 +1,161 @@
+#libraries used to share price data between worker processes
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from dataclasses import dataclass, field
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+import numpy as np
+import pandas as pd
+
+#the app modules are imported as a package in the tests and from the app folder in streamlit
+try:
+    from app.core.backtester import Backtester
+    from app.strategies.strategy_factory import get_strategy
+except ImportError:
+    from core.backtester import Backtester
+    from strategies.strategy_factory import get_strategy
+
+#dataclass describing a price series held in shared memory, this is all that gets sent to a worker
+@dataclass(frozen=True)
+class ArenaHandle:
+    ticker: str
+    #names of the shared memory segments, one per column, and the one for the index
+    names: Tuple[str, ...]
+    index_name: str
+    #shape of the values as (bars, columns), and the dtype of every column so mixed layouts are not upcast
+    shape: Tuple[int, int]
+    dtypes: Tuple[str, ...]
+    columns: Tuple[str, ...]
+    #first and last date of the series, and the dtype and timezone of the index
+    start: pd.Timestamp
+    end: pd.Timestamp
+    index_dtype: str = 'datetime64[ns]'
+    tz: Optional[str] = None
+
+#dataclass for the compact result a worker sends back
+@dataclass
+class ArenaResult:
+    ticker: str
+    strategy: str
+    params: Dict = field(default_factory=dict)
+    equity: np.ndarray = field(default_factory=lambda: np.empty(0))
+    metrics: Dict[str, float] = field(default_factory=dict)
+
+#class that loads ohlcv data into shared memory once and hands out handles to it
+class PriceArena:
+
+    #initializing an empty arena
+    def __init__(self):
+        #handles by ticker
+        self.handles: Dict[str, ArenaHandle] = {}
+        #segments created by this arena, unlinked when it is closed
+        self._segments: List[SharedMemory] = []
+
+    #function to copy a dataframe into shared memory
+    def add(self, ticker: str, data: pd.DataFrame) -> ArenaHandle:
+        #error handling if the data can not be shared
+        if data.empty:
+            raise ValueError(f"No data to share for {ticker}")
+        if not isinstance(data.index, pd.DatetimeIndex):
+            raise ValueError("Data must have a DatetimeIndex to be shared")
+        #object columns only hold pointers into this process, so they can not be shared
+        objects = [column for column, dtype in data.dtypes.items() if dtype.kind not in 'biufcmM']
+        if objects:
+            raise ValueError(f"Columns {objects} can not be shared, only numeric and datetime columns can")
+        columns = tuple(data.columns)
+        #every column gets its own segment in its own dtype, so float32 prices stay float32 next to int64 volume
+        arrays = [np.ascontiguousarray(data[column].to_numpy()) for column in columns]
+        index = data.index.tz_convert(None) if data.index.tz is not None else data.index
+        index_values = index.values
+        segments = [self._create_segment(array) for array in arrays]
+        index_segment = self._create_segment(index_values)
+        handle = ArenaHandle(
+            ticker=ticker,
+            names=tuple(segment.name for segment in segments),
+            index_name=index_segment.name,
+            shape=(len(data), len(columns)),
+            dtypes=tuple(array.dtype.str for array in arrays),
+            columns=columns,
+            start=data.index[0],
+            end=data.index[-1],
+            index_dtype=index_values.dtype.str,
+            tz=str(data.index.tz) if data.index.tz is not None else None
+        )
+        self.handles[ticker] = handle
+        return handle
+
+    #function to create a shared memory segment holding a copy of an array
+    def _create_segment(self, array: np.ndarray) -> SharedMemory:
+        segment = SharedMemory(create=True, size=max(array.nbytes, 1))
+        self._segments.append(segment)
+        np.ndarray(array.shape, dtype=array.dtype, buffer=segment.buf)[...] = array
+        return segment
+
+    #function to release every segment, workers must be finished by now
+    def close(self):
+        for segment in self._segments:
+            segment.close()
+            segment.unlink()
+        self._segments = []
+        self.handles = {}
+
+    def __enter__(self) -> "PriceArena":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+#function to open a zero copy, read only dataframe over a shared price series
+@contextmanager
+def attach(handle: ArenaHandle) -> Iterator[pd.DataFrame]:
+    segments = [SharedMemory(name=name) for name in handle.names]
+    index_segment = SharedMemory(name=handle.index_name)
+    try:
+        n_bars = handle.shape[0]
+        values = {}
+        for column, dtype, segment in zip(handle.columns, handle.dtypes, segments):
+            values[column] = np.ndarray((n_bars,), dtype=dtype, buffer=segment.buf)
+            values[column].flags.writeable = False
+        index_values = np.ndarray((n_bars,), dtype=handle.index_dtype, buffer=index_segment.buf)
+        index = pd.DatetimeIndex(index_values, name='Date')
+        if handle.tz is not None:
+            index = index.tz_localize('UTC').tz_convert(handle.tz)
+        #building the frame from a dict keeps one block per column, so the columns are not copied into one array
+        yield pd.DataFrame(values, index=index, copy=False)
+    finally:
+        #dropping our views before unmapping, anything the caller still holds keeps the mapping alive
+        values = index_values = index = None
+        for segment in segments + [index_segment]:
+            try:
+                segment.close()
+            except BufferError:
+                pass
+
+#function run inside a worker, it backtests one strategy on one shared series
+def _run_job(handle: ArenaHandle, strategy_name: str, params: Dict, backtest_kwargs: Dict) -> ArenaResult:
+    with attach(handle) as data:
+        signals = get_strategy(strategy_name).generate_signals(data, **params)
+        backtester = Backtester(data, signals, **backtest_kwargs)
+        equity = backtester.run()['Equity Curve'].to_numpy(dtype=float, copy=True)
+        metrics = backtester.get_performance_metrics()
+        #releasing the shared views so the worker can unmap the segments
+        del data, backtester
+    return ArenaResult(ticker=handle.ticker, strategy=strategy_name, params=dict(params), equity=equity, metrics=metrics)
+
+#function to run many (ticker, strategy, params) jobs across processes on the shared series
+def run_parallel(
+    arena: PriceArena,
+    jobs: Sequence[Tuple[str, str, Dict]],
+    max_workers: Optional[int] = None,
+    **backtest_kwargs
+) -> List[ArenaResult]:
+    #error handling if a job refers to a ticker that is not in the arena
+    missing = {ticker for ticker, _, _ in jobs if ticker not in arena.handles}
+    if missing:
+        raise ValueError(f"Tickers not loaded in the arena: {sorted(missing)}")
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(_run_job, arena.handles[ticker], strategy_name, params, backtest_kwargs)
+            for ticker, strategy_name, params in jobs
+        ]
+        return [future.result() for future in futures]
@@ -1,8 +1,8 @@
 #libraries used for backtesting
-from typing import List, Dict, Optional
+from typing import Iterator, List, Dict, Optional, Union
 import pandas as pd
 import numpy as np
-from dataclasses import dataclass
+from dataclasses import dataclass, field, replace
 from datetime import datetime
 
 #dataclass to store the trade information
@@ -18,6 +18,39 @@ class Trade:
     status: str = 'open'
     pnl: Optional[float] = None
     pnl_pct: Optional[float] = None
+    exit_reason: Optional[str] = None
+
+#dataclass to store the state of a backtest so it can carry on when new bars arrive
+@dataclass
+class BacktestCheckpoint:
+    #last bar processed and how many bars have been processed in total
+    last_date: datetime
+    bars_processed: int
+    #capital, equity and open position after the last bar, before the final position is closed
+    current_capital: float
+    last_equity: float
+    initial_capital: float
+    current_position: Optional[Trade] = None
+    #number of closed trades in the ledger so far, new trades are appended after this offset
+    trade_offset: int = 0
+    #best price reached since the open position was entered, used by the trailing stop
+    bracket_extreme: Optional[float] = None
+    #whatever the strategy needs to carry on generating signals
+    indicator_state: Dict = field(default_factory=dict)
+
+#signal codes, these match the batched signal matrices of the strategies
+SIGNAL_CODES = {'buy': 1, 'sell': -1}
+
+#function to turn a list of 'buy', 'sell' and None signals into a compact int8 array
+def encode_signals(signals) -> np.ndarray:
+    #numeric signals are already encoded
+    if isinstance(signals, np.ndarray) and signals.dtype.kind in 'iu':
+        return signals.astype(np.int8, copy=False)
+    #float signals can hold nan, which has no int8 value, so missing signals become holds
+    if isinstance(signals, np.ndarray) and signals.dtype.kind == 'f':
+        return np.sign(np.nan_to_num(signals, nan=0.0)).astype(np.int8)
+    #anything that is not a signal name, such as a weights dict, is a hold
+    return np.array([SIGNAL_CODES.get(signal, 0) if isinstance(signal, str) else 0 for signal in signals], dtype=np.int8)
 
 #class to run the backtest
 class Backtester:
@@ -26,44 +59,97 @@ class Backtester:
     def __init__(
         self,
         data: pd.DataFrame,
-        signals: List[str],
+        #list of 'buy', 'sell' and None signals, or an int8 array of 1, -1 and 0
+        signals: Union[List[str], np.ndarray],
         #initial capital
         initial_capital: float = 100000.0,
         #position size
         position_size: float = 1.0,
         #commission rate
-        commission: float = 0.001
+        commission: float = 0.001,
+        #stop loss, take profit and trailing stop as fractions of the entry price
+        stop_loss: Optional[float] = None,
+        take_profit: Optional[float] = None,
+        trailing_stop: Optional[float] = None,
+        #slippage applied against us on stop and take profit fills, as a fraction of the fill price
+        slippage: float = 0.0,
+        #checkpoint of an earlier run to carry on from, data then holds only the bars after it
+        checkpoint: Optional[BacktestCheckpoint] = None,
+        #dtype of the equity curve, 'float32' halves its memory while the cash stays in float64
+        dtype: str = 'float64'
     ):
         #dataframe of the price data
         self.data = data
-        #list of the signals
+        #list of the signals and their int8 codes
         self.signals = signals
+        self._signal_codes = encode_signals(signals)
         #initial capital
         self.initial_capital = initial_capital
         #position size
         self.position_size = position_size
         #commission rate
         self.commission = commission
+        #bracket exit settings
+        self.stop_loss = stop_loss
+        self.take_profit = take_profit
+        self.trailing_stop = trailing_stop
+        self.slippage = slippage
+        #error handling if brackets are used without intrabar prices
+        if self.has_brackets and not all(col in data.columns for col in ['Open', 'High', 'Low']):
+            raise ValueError("Stop loss and take profit exits need Open, High and Low columns")
+        #bar index, price and reason of the pending bracket exit for the open position
+        self._bracket_exit = None
+        #bar the open position was entered on, -1 if it was carried over from a checkpoint
+        self._entry_bar = -1
+        #checkpoint this run carries on from and the state captured at the end of this run
+        self._checkpoint = checkpoint
+        self._state: Optional[BacktestCheckpoint] = None
         #current capital
         self.current_capital = initial_capital
         #current position
         self.current_position = None
         #list of trades
         self.trades: List[Trade] = []
+        #position held at the close of every bar, 1 for long, -1 for short and 0 when flat
+        self.positions = np.zeros(len(data), dtype=np.int8)
         #equity curve
-        self.equity_curve = pd.Series(index=data.index, dtype=float)
-        #initial equity curve
-        self.equity_curve.iloc[0] = initial_capital
+        self.equity_curve = pd.Series(index=data.index, dtype=dtype)
+        if checkpoint is None:
+            #initial equity curve
+            self.equity_curve.iloc[0] = initial_capital
+        else:
+            #error handling if the new bars overlap the checkpoint
+            if len(data) and data.index[0] <= checkpoint.last_date:
+                raise ValueError("Data must start after the last bar of the checkpoint")
+            #carrying on with the capital and position of the checkpoint
+            self.initial_capital = checkpoint.initial_capital
+            self.current_capital = checkpoint.current_capital
+            if checkpoint.current_position is not None:
+                self.current_position = replace(checkpoint.current_position)
+
+    #whether any bracket exit is configured
+    @property
+    def has_brackets(self) -> bool:
+        return any(level is not None for level in (self.stop_loss, self.take_profit, self.trailing_stop))
 
     #function to run the backtest
     def run(self) -> pd.DataFrame:
+        #intrabar prices and the next opposite signal of every bar, used by the bracket exit searches
+        if self.has_brackets:
+            self._prepare_brackets()
+        #a resumed run starts on its first bar, a fresh run uses the first bar as the starting point
+        start = 0 if self._checkpoint is not None else 1
+        #a position carried over from the checkpoint needs its bracket exit searched in the new bars
+        if start == 0 and self.current_position is not None:
+            self._set_bracket_exit(-1, self._checkpoint.bracket_extreme)
         #loop through the data
-        for i in range(1, len(self.data)):
+        for i in range(start, len(self.data)):
             current_date = self.data.index[i]
-            current_price = self.data['Close'].iloc[i]
-            current_signal = self.signals[i]
+            #prices are read as float64 so the cash never drops to the precision of the data
+            current_price = float(self.data['Close'].iloc[i])
+            current_signal = self._signal_codes[i]
             #carry forward previous equity by default
-            self.equity_curve.iloc[i] = self.equity_curve.iloc[i-1]
+            self.equity_curve.iloc[i] = self.equity_curve.iloc[i-1] if i > 0 else self._checkpoint.last_equity
             #if we have an open position, update its value
             if self.current_position is not None:
                 #calculating the position value for a long position
@@ -72,24 +158,71 @@ class Backtester:
                 else:
                     #calculating the position value for a short position
                     position_value = self.current_position.position_size * (2 * self.current_position.entry_price - current_price)
+                #check for a bracket exit first, it fills intrabar before the signal at the close
+                if self._bracket_exit is not None and self._bracket_exit[0] == i:
+                    self._close_position(current_date, self._bracket_exit[1], self._bracket_exit[2])
                 #check for exit
-                if current_signal == 'sell' and self.current_position.position_type == 'long':
+                elif current_signal == -1 and self.current_position.position_type == 'long':
                     self._close_position(current_date, current_price)
-                elif current_signal == 'buy' and self.current_position.position_type == 'short':
+                elif current_signal == 1 and self.current_position.position_type == 'short':
                     self._close_position(current_date, current_price)
                 #updating the equity curve for the current position, aka the total value of the portfolio
                 self.equity_curve.iloc[i] = self.current_capital + position_value
             #if no open position, check for entry
-            if current_signal == 'buy' and self.current_position is None:
+            if current_signal == 1 and self.current_position is None:
                 self._open_position(current_date, current_price, 'long')
-            elif current_signal == 'sell' and self.current_position is None:
+                self._set_bracket_exit(i)
+            elif current_signal == -1 and self.current_position is None:
                 self._open_position(current_date, current_price, 'short')
+                self._set_bracket_exit(i)
+            #recording the position held at the close
+            if self.current_position is not None:
+                self.positions[i] = 1 if self.current_position.position_type == 'long' else -1
+        #saving the state before the final close so that a later run can carry on from here
+        self._state = self._capture_state()
+        #with no new bars there is nothing to close, the open position carries on to the next run
+        if len(self.data) == 0:
+            return pd.DataFrame({'Equity Curve': self.equity_curve})
         #close any open position at the end
         if self.current_position is not None:
-            self._close_position(self.data.index[-1], self.data['Close'].iloc[-1])
+            self._close_position(self.data.index[-1], float(self.data['Close'].iloc[-1]), 'end_of_data')
         #returning the equity curve as a dataframe
         return pd.DataFrame({'Equity Curve': self.equity_curve})
 
+    #function to capture the state of the backtest after the last bar
+    def _capture_state(self) -> BacktestCheckpoint:
+        previous = self._checkpoint
+        #with no new bars the state is the same as the checkpoint
+        if len(self.data) == 0:
+            return replace(previous)
+        extreme = None
+        position = self.current_position
+        if position is not None and self.has_brackets:
+            #best price since entry, carried over from the checkpoint when the position is older than this run
+            extreme = previous.bracket_extreme if self._entry_bar < 0 and previous is not None else None
+            extreme = position.entry_price if extreme is None else extreme
+            if position.position_type == 'long':
+                extreme = float(np.max(self._highs[self._entry_bar + 1:], initial=extreme))
+            else:
+                extreme = float(np.min(self._lows[self._entry_bar + 1:], initial=extreme))
+        return BacktestCheckpoint(
+            last_date=self.data.index[-1],
+            bars_processed=(previous.bars_processed if previous is not None else 0) + len(self.data),
+            current_capital=self.current_capital,
+            last_equity=self.equity_curve.iloc[-1],
+            initial_capital=self.initial_capital,
+            current_position=replace(position) if position is not None else None,
+            trade_offset=(previous.trade_offset if previous is not None else 0) + len(self.trades),
+            bracket_extreme=extreme
+        )
+
+    #function to get a checkpoint of the finished run, together with the strategy's indicator state
+    def checkpoint(self, indicator_state: Optional[Dict] = None) -> BacktestCheckpoint:
+        #error handling if the backtest has not been run
+        if self._state is None:
+            raise ValueError("Run the backtest before taking a checkpoint")
+        return replace(self._state, indicator_state=dict(indicator_state or {}))
+
     #function to open a new position
     def _open_position(self, date: datetime, price: float, position_type: str):
         #open a new position (long or short)
@@ -106,8 +239,78 @@ class Backtester:
         #subtracting the commission from the current capital
         self.current_capital -= commission_amount
 
+    #function to cache the price arrays used by the bracket exit searches
+    def _prepare_brackets(self):
+        self._opens = self.data['Open'].to_numpy(dtype=float)
+        self._highs = self.data['High'].to_numpy(dtype=float)
+        self._lows = self.data['Low'].to_numpy(dtype=float)
+        #index of the next sell and buy signal at or after every bar, len(data) if there is none
+        n = len(self.data)
+        positions = np.arange(n)
+        self._next_sell = np.minimum.accumulate(np.where(self._signal_codes == -1, positions, n)[::-1])[::-1]
+        self._next_buy = np.minimum.accumulate(np.where(self._signal_codes == 1, positions, n)[::-1])[::-1]
+
+    #function to find the bracket exit of a position opened at bar i, -1 for a position carried over from a checkpoint
+    def _set_bracket_exit(self, i: int, extreme: Optional[float] = None):
+        self._bracket_exit = None
+        self._entry_bar = i
+        if not self.has_brackets or i + 1 >= len(self.data):
+            return
+        position = self.current_position
+        #only bars up to the next opposite signal matter, the signal closes the position there anyway
+        next_exit = self._next_sell if position.position_type == 'long' else self._next_buy
+        end = min(next_exit[i + 1] + 1, len(self.data))
+        self._bracket_exit = self._find_bracket_exit(i + 1, end, position.position_type, position.entry_price, extreme)
+
+    #function to find the first bar in [start, end) that touches a bracket level, with its fill price and reason
+    def _find_bracket_exit(self, start: int, end: int, position_type: str, entry_price: float, extreme: Optional[float] = None):
+        opens = self._opens[start:end]
+        highs = self._highs[start:end]
+        lows = self._lows[start:end]
+        #the long side is searched directly, the short side is mirrored by flipping the sign of the prices
+        sign = 1.0 if position_type == 'long' else -1.0
+        if sign < 0:
+            opens, highs, lows = -opens, -lows, -highs
+        entry = sign * entry_price
+        extreme = entry if extreme is None else sign * extreme
+        stop_level = np.full(len(opens), -np.inf)
+        reasons = np.full(len(opens), 'stop_loss', dtype=object)
+        if self.stop_loss is not None:
+            stop_level[:] = entry - abs(entry) * self.stop_loss
+        if self.trailing_stop is not None:
+            #best price reached before each bar, the current bar's high is not known when its low prints
+            peak = np.maximum.accumulate(np.concatenate(([extreme], highs[:-1])))
+            trail_level = peak - np.abs(peak) * self.trailing_stop
+            reasons[trail_level > stop_level] = 'trailing_stop'
+            stop_level = np.maximum(stop_level, trail_level)
+        stop_hits = lows <= stop_level
+        if self.take_profit is not None:
+            take_level = entry + abs(entry) * self.take_profit
+            take_hits = highs >= take_level
+        else:
+            take_hits = np.zeros(len(opens), dtype=bool)
+        #first touch of each side, len(opens) if it is never touched
+        first_stop = int(np.argmax(stop_hits)) if stop_hits.any() else len(opens)
+        first_take = int(np.argmax(take_hits)) if take_hits.any() else len(opens)
+        if first_stop == len(opens) and first_take == len(opens):
+            return None
+        #if both levels are touched in the same bar we assume the stop was hit first
+        if first_stop <= first_take:
+            j = first_stop
+            #a gap through the stop fills at the open
+            fill = min(opens[j], stop_level[j])
+            reason = reasons[j]
+        else:
+            j = first_take
+            #a gap through the target fills at the open
+            fill = max(opens[j], take_level)
+            reason = 'take_profit'
+        #flipping back to real prices and applying slippage against the position
+        price = sign * fill * (1 - sign * self.slippage)
+        return start + j, price, reason
+
     #function to close a position
-    def _close_position(self, date: datetime, price: float):
+    def _close_position(self, date: datetime, price: float, reason: str = 'signal'):
         #close the current position and log the trade
         if self.current_position is None:
             return
@@ -126,36 +329,41 @@ class Backtester:
         self.current_position.status = 'closed'
         self.current_position.pnl = pnl
         self.current_position.pnl_pct = pnl_pct
+        self.current_position.exit_reason = reason
         #updating the current capital
         self.current_capital += pnl - commission_amount
         #adding the trade to the list of trades
         self.trades.append(self.current_position)
         #resetting the current position
         self.current_position = None
+        self._bracket_exit = None
 
     #function to get the trade log
     def get_trade_log(self) -> pd.DataFrame:
         #error handling if no trades are found
         if not self.trades:
             return pd.DataFrame()
-        #list to store the trade data
-        trade_data = []
-        #loop through the trades
-        for trade in self.trades:
-            #adding the trade data to the list
-            trade_data.append({
-                'Entry Date': trade.entry_date,
-                'Entry Price': trade.entry_price,
-                'Position Size': trade.position_size,
-                'Exit Date': trade.exit_date,
-                'Exit Price': trade.exit_price,
-                'Position Type': trade.position_type,
-                'PnL': trade.pnl,
-                'PnL %': trade.pnl_pct,
-                'Status': trade.status,
-                'Trade Duration': (trade.exit_date - trade.entry_date).days if trade.exit_date and trade.entry_date else None
-            })
-        return pd.DataFrame(trade_data)
+        return pd.concat(self.iter_trade_log(), ignore_index=True)
+
+    #function to build the trade log in typed chunks, so large logs never have to sit in one table
+    def iter_trade_log(self, chunk_size: int = 100000) -> Iterator[pd.DataFrame]:
+        for start in range(0, len(self.trades), chunk_size):
+            trades = self.trades[start:start + chunk_size]
+            entry_dates = pd.to_datetime([trade.entry_date for trade in trades])
+            exit_dates = pd.to_datetime([trade.exit_date for trade in trades])
+            yield pd.DataFrame({
+                'Entry Date': entry_dates,
+                'Entry Price': np.array([trade.entry_price for trade in trades], dtype=float),
+                'Position Size': np.array([trade.position_size for trade in trades], dtype=float),
+                'Exit Date': exit_dates,
+                'Exit Price': np.array([trade.exit_price for trade in trades], dtype=float),
+                'Position Type': pd.array([trade.position_type for trade in trades], dtype='string'),
+                'PnL': np.array([trade.pnl for trade in trades], dtype=float),
+                'PnL %': np.array([trade.pnl_pct for trade in trades], dtype=float),
+                'Status': pd.array([trade.status for trade in trades], dtype='string'),
+                'Exit Reason': pd.array([trade.exit_reason for trade in trades], dtype='string'),
+                'Trade Duration': pd.array((exit_dates - entry_dates).days, dtype='Int64')
+            }, index=pd.RangeIndex(start, start + len(trades)))
 
     #function to get the performance metrics
     def get_performance_metrics(self) -> Dict[str, float]:
@@ -184,4 +392,67 @@ class Backtester:
             'Average Loss': avg_loss,
             'Profit Factor': profit_factor,
             'Total Return': ((self.current_capital - self.initial_capital) / self.initial_capital) * 100
-        }
\ No newline at end of file
+        }
+
+#class to backtest target weights over a dates x symbols price matrix, used by the cross sectional strategies
+class PortfolioBacktester:
+
+    #initializing the portfolio backtester
+    def __init__(
+        self,
+        prices: pd.DataFrame,
+        weights: pd.DataFrame,
+        #initial capital
+        initial_capital: float = 100000.0,
+        #commission rate, charged on the traded notional like the single ticker backtester
+        commission: float = 0.001,
+        #dates the holdings are reset to the targets even when the targets did not change
+        rebalance: Optional[Union[pd.Series, np.ndarray]] = None
+    ):
+        #error handling if the weights or rebalance dates do not line up with the prices
+        if prices.shape != weights.shape:
+            raise ValueError("Prices and weights must have the same shape")
+        if rebalance is not None and len(rebalance) != len(prices):
+            raise ValueError("Rebalance dates must have one entry per date")
+        self.prices = prices
+        self.weights = weights
+        self.rebalance = rebalance
+        self.initial_capital = initial_capital
+        self.commission = commission
+
+    #function to run the backtest, weights set at a close earn the returns of the next bar
+    def run(self) -> pd.DataFrame:
+        prices = self.prices.to_numpy(dtype=float)
+        weights = self.weights.to_numpy(dtype=float)
+        #returns of every symbol, symbols without a price yet return nothing
+        returns = np.zeros(prices.shape)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            returns[1:] = prices[1:] / prices[:-1] - 1
+        returns = np.nan_to_num(returns, nan=0.0, posinf=0.0, neginf=0.0)
+        #the targets are traded on every rebalance date and whenever they change, holdings drift with the prices in between
+        n_dates = len(prices)
+        dates = np.arange(n_dates)
+        previous = np.vstack([np.zeros((1, weights.shape[1])), weights[:-1]])
+        rebalance = np.abs(weights - previous).sum(axis=1) > 0
+        if self.rebalance is not None:
+            rebalance |= np.asarray(self.rebalance, dtype=bool)
+        rebalance[0] = True
+        last_rebalance = np.maximum.accumulate(np.where(rebalance, dates, 0))
+        #growth of every symbol since the last rebalance, the part not in the targets is cash and does not move
+        growth = np.cumprod(1 + returns, axis=0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            since = np.nan_to_num(growth / growth[last_rebalance], nan=1.0, posinf=1.0, neginf=1.0)
+            value = (weights * since).sum(axis=1) + 1 - weights.sum(axis=1)
+            #weights actually held at every close after trading
+            held = np.nan_to_num(weights * since / value[:, None])
+        #portfolio return of every bar from the previous bar's holdings
+        gross = np.zeros(n_dates)
+        gross[1:] = (held[:-1] * returns[1:]).sum(axis=1)
+        #holdings just before each close, turnover is what it takes to bring them back to the targets
+        drifted = np.zeros(weights.shape)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            drifted[1:] = np.nan_to_num(held[:-1] * (1 + returns[1:]) / (1 + gross[1:, None]))
+        turnover = np.where(rebalance, np.abs(weights - drifted).sum(axis=1), 0.0)
+        #commission is paid on the traded notional at each close
+        equity = self.initial_capital * np.cumprod(1 + gross - turnover * self.commission)
+        return pd.DataFrame({'Equity Curve': equity, 'Turnover': turnover}, index=self.prices.index)
\ No newline at end of file
@@ -0,0 +1,150 @@
+#libraries used for the monte carlo scenario engine
+from typing import Optional, Sequence, Union
+from dataclasses import dataclass
+import numpy as np
+import pandas as pd
+
+#the app modules are imported as a package in the tests and from the app folder in streamlit
+try:
+    from app.metrics.performance import (
+        calculate_sharpe_ratio_batch,
+        calculate_max_drawdown_batch,
+        calculate_cagr_batch,
+    )
+    from app.strategies.strategy_factory import Strategy, get_strategy
+except ImportError:
+    from metrics.performance import (
+        calculate_sharpe_ratio_batch,
+        calculate_max_drawdown_batch,
+        calculate_cagr_batch,
+    )
+    from strategies.strategy_factory import Strategy, get_strategy
+
+#dataclass to store the results of a monte carlo run
+@dataclass
+class MonteCarloResult:
+    #simulated prices and equity curves, rows are bars and columns are paths
+    prices: np.ndarray
+    equity: np.ndarray
+    #metrics for every path and the percentiles of their distributions
+    metrics: pd.DataFrame
+    summary: pd.DataFrame
+
+#function to simulate price paths from a price series, rows are bars and columns are paths
+def simulate_price_paths(
+    close: Union[pd.Series, np.ndarray],
+    n_paths: int = 1000,
+    n_bars: Optional[int] = None,
+    #either 'bootstrap' for a block bootstrap of the log returns or 'gbm' for geometric brownian motion
+    method: str = 'bootstrap',
+    block_size: int = 20,
+    seed: Optional[int] = None
+) -> np.ndarray:
+    close = np.asarray(close, dtype=float).ravel()
+    #error handling if there is not enough data to take returns from
+    if len(close) < 2:
+        raise ValueError("At least two prices are needed to simulate paths")
+    n_bars = n_bars or len(close)
+    rng = np.random.default_rng(seed)
+    #log returns of the original series
+    log_returns = np.diff(np.log(close))
+    n_steps = n_bars - 1
+    if method == 'gbm':
+        #drawing normal returns with the same mean and volatility as the original series
+        sampled = rng.normal(log_returns.mean(), log_returns.std(ddof=1), size=(n_steps, n_paths))
+    elif method == 'bootstrap':
+        #drawing whole blocks of returns so that volatility clustering is kept
+        block_size = max(1, min(block_size, len(log_returns)))
+        n_blocks = -(-n_steps // block_size)
+        starts = rng.integers(0, len(log_returns) - block_size + 1, size=(n_blocks, 1, n_paths))
+        offsets = np.arange(block_size)[None, :, None]
+        sampled = log_returns[starts + offsets].reshape(n_blocks * block_size, n_paths)[:n_steps]
+    else:
+        raise ValueError(f"Unknown simulation method '{method}'")
+    #every path starts from the first price of the original series
+    paths = np.empty((n_bars, n_paths))
+    paths[0] = close[0]
+    paths[1:] = close[0] * np.exp(np.cumsum(sampled, axis=0))
+    return paths
+
+#function to backtest a matrix of signals on a matrix of prices, all paths are stepped together
+def run_batch_backtest(
+    prices: np.ndarray,
+    signals: np.ndarray,
+    initial_capital: float = 100000.0,
+    position_size: float = 1.0,
+    commission: float = 0.001
+) -> np.ndarray:
+    #error handling if the prices and signals do not line up
+    if prices.shape != signals.shape:
+        raise ValueError("Prices and signals must have the same shape")
+    n_bars, n_paths = prices.shape
+    #state of every path, direction is 1 for long, -1 for short and 0 when flat
+    capital = np.full(n_paths, initial_capital, dtype=float)
+    direction = np.zeros(n_paths, dtype=np.int8)
+    units = np.zeros(n_paths)
+    entry_price = np.zeros(n_paths)
+    #equity curves, following the same accounting as the backtester
+    equity = np.empty((n_bars, n_paths))
+    equity[0] = initial_capital
+    for i in range(1, n_bars):
+        price = prices[i]
+        signal = signals[i]
+        #carry forward previous equity by default
+        equity[i] = equity[i-1]
+        #valuing the open positions
+        is_open = direction != 0
+        position_value = np.where(direction == 1, units * price, units * (2 * entry_price - price))
+        #closing positions on an opposite signal
+        closing = is_open & (signal == -direction)
+        pnl = np.where(direction == 1, price - entry_price, entry_price - price) * units
+        capital = np.where(closing, capital + (pnl - units * price * commission), capital)
+        direction[closing] = 0
+        equity[i] = np.where(is_open, capital + position_value, equity[i])
+        #opening positions on flat paths with a signal
+        opening = (direction == 0) & (signal != 0)
+        new_units = (capital * position_size) / price
+        units = np.where(opening, new_units, units)
+        entry_price = np.where(opening, price, entry_price)
+        capital = np.where(opening, capital - new_units * price * commission, capital)
+        direction[opening] = signal[opening]
+    return equity
+
+#function to run a strategy over simulated price paths and summarise the metric distributions
+def run_monte_carlo(
+    data: pd.DataFrame,
+    strategy: Union[str, Strategy],
+    n_paths: int = 1000,
+    method: str = 'bootstrap',
+    block_size: int = 20,
+    seed: Optional[int] = None,
+    percentiles: Sequence[float] = (5, 25, 50, 75, 95),
+    initial_capital: float = 100000.0,
+    position_size: float = 1.0,
+    commission: float = 0.001,
+    #length of the simulated history in years, defaults to 252 bars a year
+    years: Optional[float] = None,
+    **strategy_params
+) -> MonteCarloResult:
+    #getting the strategy by name if needed
+    if isinstance(strategy, str):
+        strategy = get_strategy(strategy)
+    #simulating the paths and generating every signal in one batch
+    prices = simulate_price_paths(data['Close'], n_paths, method=method, block_size=block_size, seed=seed)
+    signals = strategy.generate_signal_matrix(prices, **strategy_params)
+    equity = run_batch_backtest(prices, signals, initial_capital, position_size, commission)
+    #calculating the metrics of every path
+    returns = equity[1:] / equity[:-1] - 1
+    years = years or len(prices) / 252
+    metrics = pd.DataFrame({
+        'Sharpe Ratio': calculate_sharpe_ratio_batch(returns),
+        'Max Drawdown': calculate_max_drawdown_batch(equity),
+        'CAGR': calculate_cagr_batch(equity, years)
+    })
+    #percentiles of every metric across the paths
+    summary = pd.DataFrame(
+        np.percentile(metrics.to_numpy(), percentiles, axis=0),
+        index=[f"P{p:g}" for p in percentiles],
+        columns=metrics.columns
+    )
+    return MonteCarloResult(prices=prices, equity=equity, metrics=metrics, summary=summary)
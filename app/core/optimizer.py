@@ -0,0 +1,162 @@
+#libraries used for the parameter optimizer
+from typing import Dict, List, Optional, Tuple
+from dataclasses import dataclass
+from itertools import product
+import math
+import numpy as np
+import pandas as pd
+
+#the app modules are imported as a package in the tests and from the app folder in streamlit
+try:
+    from app.core.backtester import Backtester
+    from app.metrics.performance import calculate_total_return, calculate_sharpe_ratio, calculate_sortino_ratio
+    from app.strategies.strategy_factory import PARAMETER_RANGES, get_strategy
+except ImportError:
+    from core.backtester import Backtester
+    from metrics.performance import calculate_total_return, calculate_sharpe_ratio, calculate_sortino_ratio
+    from strategies.strategy_factory import PARAMETER_RANGES, get_strategy
+
+#metrics the optimizer can maximise, each one takes the equity curve
+OBJECTIVES = {
+    "Sharpe Ratio": lambda equity: calculate_sharpe_ratio(equity.pct_change().dropna()),
+    "Sortino Ratio": lambda equity: calculate_sortino_ratio(equity.pct_change().dropna()),
+    "Total Return": calculate_total_return
+}
+
+#dataclass to store the result of an optimization run
+@dataclass
+class OptimizationResult:
+    best_params: Dict
+    best_score: float
+    #one row per evaluation with the round, history fraction, bars actually backtested, parameters and score
+    history: pd.DataFrame
+    #evaluations and bars backtested compared with running every candidate on the full history
+    evaluations: int
+    full_grid_evaluations: int
+    bars_evaluated: int
+    full_grid_bars: int
+
+    #share of the full grid compute that was saved
+    @property
+    def savings(self) -> float:
+        if self.full_grid_bars == 0:
+            return 0.0
+        return 1 - self.bars_evaluated / self.full_grid_bars
+
+#function to check that the parameters make sense together
+def _is_valid(params: Dict) -> bool:
+    if params.get('short_window', 0) >= params.get('long_window', math.inf):
+        return False
+    if params.get('fast_period', 0) >= params.get('slow_period', math.inf):
+        return False
+    if params.get('oversold', 0) >= params.get('overbought', math.inf):
+        return False
+    return True
+
+#function to build every valid parameter combination for a strategy
+def build_parameter_grid(strategy_name: str, ranges: Optional[Dict[str, Tuple[float, float, float]]] = None) -> List[Dict]:
+    #error handling if there are no ranges for the strategy
+    ranges = ranges or PARAMETER_RANGES.get(strategy_name)
+    if not ranges:
+        raise ValueError(f"No parameter ranges defined for '{strategy_name}'")
+    names = list(ranges)
+    #every range includes both of its bounds, even when the step does not land on the upper one
+    values = [sorted({low + i * step for i in range(int((high - low) // step) + 1)} | {high}) for low, high, step in ranges.values()]
+    grid = [dict(zip(names, combination)) for combination in product(*values)]
+    return [params for params in grid if _is_valid(params)]
+
+#function to get the number of bars a set of parameters needs before it can trade
+def warmup_bars(strategy_name: str, params: Dict) -> int:
+    try:
+        return get_strategy(strategy_name).lookback(**params)
+    except NotImplementedError:
+        #strategies without a lookback fall back to their longest window or period
+        windows = [value for name, value in params.items() if name.endswith(('window', 'period', 'lookback'))]
+        return int(max(windows, default=0))
+
+#function to score one set of parameters on a prefix of the data
+def evaluate_parameters(
+    data: pd.DataFrame,
+    strategy_name: str,
+    params: Dict,
+    metric: str = "Sharpe Ratio",
+    **backtest_kwargs
+) -> float:
+    #strategies add indicator columns, so they get their own copy
+    data = data.copy()
+    signals = get_strategy(strategy_name).generate_signals(data, **params)
+    equity = Backtester(data, signals, **backtest_kwargs).run()['Equity Curve']
+    score = OBJECTIVES[metric](equity)
+    #failed evaluations rank last
+    return -math.inf if score is None or np.isnan(score) else float(score)
+
+#function to search the parameters with successive halving, losers are pruned on short prefixes of history
+def successive_halving(
+    data: pd.DataFrame,
+    strategy_name: str,
+    candidates: Optional[List[Dict]] = None,
+    metric: str = "Sharpe Ratio",
+    #fraction of candidates kept after each round is 1 / eta
+    eta: int = 3,
+    #share of the history used in the first round
+    min_fraction: float = 1 / 9,
+    #bars every prefix has after the longest warmup, at least as many as the warmup itself so slow candidates get to trade
+    min_scoring_bars: int = 60,
+    **backtest_kwargs
+) -> OptimizationResult:
+    #error handling if the settings are invalid
+    if metric not in OBJECTIVES:
+        raise ValueError(f"Unknown metric '{metric}', choose from {list(OBJECTIVES)}")
+    if eta < 2 or not 0 < min_fraction <= 1:
+        raise ValueError("eta must be at least 2 and min_fraction must be in (0, 1]")
+    candidates = candidates if candidates is not None else build_parameter_grid(strategy_name)
+    if not candidates:
+        raise ValueError("No parameter candidates to evaluate")
+    n_bars = len(data)
+    #history fractions grow by eta every round until the full history is used
+    n_rounds = max(1, math.ceil(math.log(1 / min_fraction, eta) - 1e-9) + 1)
+    fractions = [min(1.0, min_fraction * eta ** k) for k in range(n_rounds)]
+    survivors = list(candidates)
+    rows = []
+    bars_evaluated = 0
+    #length of the last prefix that was scored
+    previous_bars = 0
+    for round_number, fraction in enumerate(fractions):
+        #the last round always runs on the full history
+        if round_number == len(fractions) - 1:
+            fraction = 1.0
+        #every survivor gets the same prefix, long enough for the slowest of them to trade
+        warmup = max(warmup_bars(strategy_name, params) for params in survivors)
+        #prefixes never shrink, even when the slowest candidates have been pruned
+        prefix_bars = max(int(round(n_bars * fraction)), warmup + max(warmup, min_scoring_bars), previous_bars, 2)
+        prefix = data.iloc[:min(prefix_bars, n_bars)]
+        #a prefix stretched to the length of the last one adds no evidence, so the survivors carry over uncut
+        if len(prefix) == previous_bars:
+            continue
+        previous_bars = len(prefix)
+        scores = []
+        for params in survivors:
+            score = evaluate_parameters(prefix, strategy_name, params, metric, **backtest_kwargs)
+            scores.append(score)
+            rows.append({'Round': round_number, 'Fraction': fraction, 'Bars': len(prefix), 'Params': params, 'Score': score})
+        bars_evaluated += len(prefix) * len(survivors)
+        #keeping the best 1 / eta of the candidates for the next round
+        ranked = sorted(zip(scores, range(len(survivors))), key=lambda item: item[0], reverse=True)
+        if fraction < 1.0 and len(prefix) < n_bars:
+            keep = max(1, math.ceil(len(survivors) / eta))
+            #candidates tied with the last one kept also go through, so grid order never decides a cut
+            cutoff = ranked[keep - 1][0]
+            survivors = [survivors[index] for score, index in ranked if score >= cutoff]
+        else:
+            best_score, best_index = ranked[0]
+            best_params = survivors[best_index]
+            break
+    return OptimizationResult(
+        best_params=best_params,
+        best_score=best_score,
+        history=pd.DataFrame(rows),
+        evaluations=len(rows),
+        full_grid_evaluations=len(candidates),
+        bars_evaluated=bars_evaluated,
+        full_grid_bars=len(candidates) * n_bars
+    )
@@ -0,0 +1,83 @@
+#libraries used to check how far float32 runs drift from float64 runs
+from typing import Dict, Optional
+import numpy as np
+import pandas as pd
+
+#the app modules are imported as a package in the tests and from the app folder in streamlit
+try:
+    from app.core.backtester import Backtester, encode_signals
+    from app.data.market_data import to_price_dtype
+    from app.metrics.performance import (
+        calculate_total_return,
+        calculate_sharpe_ratio,
+        calculate_max_drawdown,
+        calculate_cagr,
+    )
+    from app.strategies.strategy_factory import get_strategy
+except ImportError:
+    from core.backtester import Backtester, encode_signals
+    from data.market_data import to_price_dtype
+    from metrics.performance import (
+        calculate_total_return,
+        calculate_sharpe_ratio,
+        calculate_max_drawdown,
+        calculate_cagr,
+    )
+    from strategies.strategy_factory import get_strategy
+
+#function to run one strategy with the prices, indicators and equity in the given dtype
+def run_with_precision(
+    data: pd.DataFrame,
+    strategy_name: str,
+    dtype: str = 'float32',
+    params: Optional[Dict] = None,
+    **backtest_kwargs
+) -> Dict:
+    #casting the prices, the strategy then keeps its indicators in the same dtype
+    frame = to_price_dtype(data, dtype)
+    signals = encode_signals(get_strategy(strategy_name).generate_signals(frame, **(params or {})))
+    backtester = Backtester(frame, signals, dtype=dtype, **backtest_kwargs)
+    equity = backtester.run()['Equity Curve']
+    #memory of the prices, indicators, signals, positions and equity curve
+    memory = int(frame.memory_usage(deep=True).sum() + signals.nbytes + backtester.positions.nbytes + equity.memory_usage(deep=True))
+    return {'signals': signals, 'equity': equity, 'backtester': backtester, 'memory': memory}
+
+#function to build a report of how far the float32 metrics are from the float64 ones
+def compare_precision(
+    data: pd.DataFrame,
+    strategy_name: str,
+    params: Optional[Dict] = None,
+    #length of the data in years, defaults to the span of the index
+    years: Optional[float] = None,
+    **backtest_kwargs
+) -> pd.DataFrame:
+    if years is None:
+        if isinstance(data.index, pd.DatetimeIndex) and len(data) > 1:
+            years = (data.index[-1] - data.index[0]).days / 365.25
+        else:
+            years = len(data) / 252
+    columns = {}
+    for dtype in ('float64', 'float32'):
+        run = run_with_precision(data, strategy_name, dtype, params, **backtest_kwargs)
+        #metrics are always calculated in float64 so only the run itself differs
+        equity = run['equity'].astype(float)
+        returns = equity.pct_change().dropna()
+        columns[dtype] = {
+            'Total Return': calculate_total_return(equity),
+            'Sharpe Ratio': calculate_sharpe_ratio(returns),
+            'Max Drawdown': calculate_max_drawdown(equity),
+            'CAGR': calculate_cagr(equity, years),
+            'Final Equity': equity.iloc[-1],
+            'Total Trades': len(run['backtester'].trades),
+            'Memory (bytes)': run['memory']
+        }
+        columns[dtype + ' signals'] = run['signals']
+    signals_64 = columns.pop('float64 signals')
+    signals_32 = columns.pop('float32 signals')
+    report = pd.DataFrame(columns, dtype=float)
+    report.loc['Signal Mismatches'] = [0.0, float(np.count_nonzero(signals_64 != signals_32))]
+    #absolute and relative deviation of the float32 run
+    report['Abs Diff'] = (report['float32'] - report['float64']).abs()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        report['Rel Diff %'] = report['Abs Diff'] / report['float64'].abs() * 100
+    return report
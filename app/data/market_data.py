@@ -2,7 +2,7 @@
 import yfinance as yf
 import pandas as pd
 #union used for type hinting, so it can accept either a string, date or datetime for instance
-from typing import Union
+from typing import Optional, Union
 from datetime import datetime, date
 
 #function to fetch market data from yahoo finance
@@ -10,7 +10,9 @@ def fetch_market_data(
     ticker: str,
     #here is the example of type hinting
     start_date: Union[str, date, datetime],
-    end_date: Union[str, date, datetime]
+    end_date: Union[str, date, datetime],
+    #dtype for the price columns, e.g. 'float32' to halve the memory of the prices
+    dtype: Optional[str] = None
 ) -> pd.DataFrame:
 
     #error handlign using try except block
@@ -35,12 +37,25 @@ def fetch_market_data(
         data.index.name = 'Date'
         #dropping any rows with missing values
         data = data.dropna()
+        #casting the prices if a compact dtype was asked for
+        if dtype is not None:
+            data = to_price_dtype(data, dtype)
         #returning the cleaned dataframe
         return data
     #catching any errors and raising a value error with the error message
     except Exception as e:
         raise ValueError(f"Error fetching data for {ticker}: {str(e)}")
 
+#function to cast the price columns of the data, volume is left alone because float32 can not hold large volumes exactly
+def to_price_dtype(df: pd.DataFrame, dtype: str = 'float32') -> pd.DataFrame:
+    price_columns = ['Open', 'High', 'Low', 'Close', 'Adj Close']
+    #yfinance can return multi indexed columns with the price name first
+    casts = {
+        col: dtype for col in df.columns
+        if (col[0] if isinstance(col, tuple) else col) in price_columns
+    }
+    return df.astype(casts)
+
 #function to validate the data
 def validate_data(df: pd.DataFrame) -> bool:
 
@@ -0,0 +1,92 @@
+#libraries used for resampling market data into higher timeframes
+import pandas as pd
+import numpy as np
+from typing import Dict, Union
+from pandas.tseries.frequencies import to_offset
+from pandas.tseries.offsets import Tick
+
+#how every ohlcv column is aggregated into a higher timeframe bar
+OHLCV_AGGREGATION = {
+    'Open': 'first',
+    'High': 'max',
+    'Low': 'min',
+    'Close': 'last',
+    'Volume': 'sum'
+}
+
+#function to resample ohlcv bars, returns the non empty bars and how many base bars went into each
+def resample_ohlcv(data: pd.DataFrame, rule: str):
+    #error handling if the index can not be resampled
+    if not isinstance(data.index, pd.DatetimeIndex):
+        raise ValueError("Data must have a DatetimeIndex to be resampled")
+    aggregation = {col: how for col, how in OHLCV_AGGREGATION.items() if col in data.columns}
+    #fixed size bins are anchored to the epoch so that resampling a slice lines up with the full history
+    kwargs = {'origin': 'epoch'} if isinstance(to_offset(rule), Tick) else {}
+    resampler = data[list(aggregation)].resample(rule, **kwargs)
+    bars = resampler.agg(aggregation)
+    counts = resampler.size().to_numpy()
+    #dropping the empty bins such as weekends and overnight gaps
+    non_empty = counts > 0
+    return bars[non_empty], counts[non_empty]
+
+#class to build higher timeframe bars from base bars once and reuse them across strategies
+class TimeframeCache:
+
+    #initializing the cache with the base bars
+    def __init__(self, data: pd.DataFrame):
+        #dataframe of the base bars
+        self.data = data
+        #higher timeframe bars for every rule
+        self._bars: Dict[str, pd.DataFrame] = {}
+        #number of base bars in every higher timeframe bar
+        self._counts: Dict[str, np.ndarray] = {}
+        #position of the higher timeframe bar that each base bar belongs to
+        self._positions: Dict[str, np.ndarray] = {}
+
+    #function to get the higher timeframe bars for a rule such as '5min', '1h', '1D' or 'W'
+    def get(self, rule: str) -> pd.DataFrame:
+        if rule not in self._bars:
+            bars, counts = resample_ohlcv(self.data, rule)
+            self._bars[rule] = bars
+            self._counts[rule] = counts
+            self._positions[rule] = np.repeat(np.arange(len(bars)), counts)
+        return self._bars[rule]
+
+    #function to line up higher timeframe values with the base bars without lookahead
+    def align(self, rule: str, values: Union[str, pd.Series] = 'Close') -> pd.Series:
+        bars = self.get(rule)
+        #values can be a column of the higher timeframe bars or an indicator calculated on them
+        if isinstance(values, str):
+            name = values
+            values = bars[values]
+        else:
+            name = values.name
+        #error handling if the indicator was not calculated on these bars
+        if len(values) != len(bars):
+            raise ValueError(f"Values must have one entry per '{rule}' bar")
+        #each base bar only sees the last completed higher timeframe bar, not the one it is part of
+        previous = self._positions[rule] - 1
+        source = np.asarray(values, dtype=float)
+        aligned = np.where(previous >= 0, source[np.maximum(previous, 0)], np.nan)
+        return pd.Series(aligned, index=self.data.index, name=name)
+
+    #function to add new base bars and update the cached higher timeframe bars
+    def append(self, new_bars: pd.DataFrame):
+        if new_bars.empty:
+            return
+        #error handling if the new bars overlap the existing ones
+        if not self.data.empty and new_bars.index[0] <= self.data.index[-1]:
+            raise ValueError("New bars must start after the last cached bar")
+        self.data = pd.concat([self.data, new_bars])
+        for rule in list(self._bars):
+            bars = self._bars[rule]
+            counts = self._counts[rule]
+            #only the last higher timeframe bar can still change, so it is rebuilt from its base bars plus the new ones
+            tail_length = (counts[-1] if len(counts) else 0) + len(new_bars)
+            tail_bars, tail_counts = resample_ohlcv(self.data.iloc[-tail_length:], rule)
+            first = max(len(bars) - 1, 0)
+            self._bars[rule] = pd.concat([bars.iloc[:first], tail_bars])
+            self._counts[rule] = np.concatenate([counts[:first], tail_counts])
+            #positions of the existing base bars never change
+            tail_positions = first + np.repeat(np.arange(len(tail_bars)), tail_counts)
+            self._positions[rule] = np.concatenate([self._positions[rule], tail_positions[-len(new_bars):]])
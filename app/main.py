@@ -15,7 +15,8 @@ from metrics.performance import (
     calculate_sortino_ratio,
     calculate_calmar_ratio,
 )
-from strategies.strategy_factory import get_strategy
+from strategies.strategy_factory import PARAMETER_RANGES, get_strategy
+from utils.export import EXPORT_FORMATS, PYARROW_AVAILABLE, ExportStream, iter_equity_curve, stream_export
 
 #setting up the steamlit page with title ext
 st.set_page_config(
@@ -78,6 +79,13 @@ def render_sidebar():
     #parameters of selected strat using get strategy parameters function below
     strategy_params = get_strategy_parameters(selected_strategy)
     
+    #export selection, only the picked table is built and only in the picked format
+    st.sidebar.markdown("---")
+    export_table = st.sidebar.selectbox("Export", ["None", "Trade Log", "Equity Curve"])
+    #parquet and arrow keep the column types, they need pyarrow installed
+    formats = list(EXPORT_FORMATS) if PYARROW_AVAILABLE else ['csv']
+    export_format = st.sidebar.selectbox("Export format", formats, disabled=export_table == "None")
+    
     #run button
     run_button = st.sidebar.button("🚀 Run Simulation")
     
@@ -88,6 +96,8 @@ def render_sidebar():
         'end_date': selected_end_date,
         'strategy': selected_strategy,
         'params': strategy_params,
+        'export_table': export_table,
+        'export_format': export_format,
         'run_button': run_button
     }
 
@@ -95,50 +105,52 @@ def render_sidebar():
 def get_strategy_parameters(strategy_name: str) -> dict:
     #dictionary of parameter controls based on the strategy
     params = {}
+    #bounds of every control, the optimizer searches the same ranges
+    ranges = {name: (low, high) for name, (low, high, _) in PARAMETER_RANGES.get(strategy_name, {}).items()}
     if strategy_name == "SMA Crossover":
         #e.g. create a short window for sma crossover with default values and help icon
         params["short_window"] = st.sidebar.number_input(
-            "Short Window", min_value=1, max_value=100, value=20,
+            "Short Window", min_value=ranges["short_window"][0], max_value=ranges["short_window"][1], value=20,
             help="Number of days for the short moving average"
         )
         #also a long window parameter with similar settings
         params["long_window"] = st.sidebar.number_input(
-            "Long Window", min_value=1, max_value=200, value=50,
+            "Long Window", min_value=ranges["long_window"][0], max_value=ranges["long_window"][1], value=50,
             help="Number of days for the long moving average"
         )
     elif strategy_name == "RSI Strategy":
         params["period"] = st.sidebar.number_input(
-            "RSI Period", min_value=1, max_value=50, value=14,
+            "RSI Period", min_value=ranges["period"][0], max_value=ranges["period"][1], value=14,
             help="Number of days to calculate RSI"
         )
         params["overbought"] = st.sidebar.slider(
-            "Overbought Threshold", 50, 100, 70,
+            "Overbought Threshold", *ranges["overbought"], 70,
             help="RSI value above which the asset is considered overbought"
         )
         params["oversold"] = st.sidebar.slider(
-            "Oversold Threshold", 0, 50, 30,
+            "Oversold Threshold", *ranges["oversold"], 30,
             help="RSI value below which the asset is considered oversold"
         )
     elif strategy_name == "MACD Strategy":
         params["fast_period"] = st.sidebar.number_input(
-            "Fast EMA Period", min_value=1, max_value=50, value=12,
+            "Fast EMA Period", min_value=ranges["fast_period"][0], max_value=ranges["fast_period"][1], value=12,
             help="Number of days for the fast EMA in MACD"
         )
         params["slow_period"] = st.sidebar.number_input(
-            "Slow EMA Period", min_value=1, max_value=100, value=26,
+            "Slow EMA Period", min_value=ranges["slow_period"][0], max_value=ranges["slow_period"][1], value=26,
             help="Number of days for the slow EMA in MACD"
         )
         params["signal_period"] = st.sidebar.number_input(
-            "Signal Line Period", min_value=1, max_value=50, value=9,
+            "Signal Line Period", min_value=ranges["signal_period"][0], max_value=ranges["signal_period"][1], value=9,
             help="Number of days for the MACD signal line"
         )
     elif strategy_name == "Bollinger Bands":
         params["window"] = st.sidebar.number_input(
-            "Window (Period)", min_value=5, max_value=100, value=20,
+            "Window (Period)", min_value=ranges["window"][0], max_value=ranges["window"][1], value=20,
             help="Number of days for the moving average window"
         )
         params["num_std"] = st.sidebar.slider(
-            "Num Std Devs", 1, 4, 2,
+            "Num Std Devs", *ranges["num_std"], 2,
             help="Number of standard deviations for the bands"
         )
     #returning the parameters dictionary
@@ -251,21 +263,27 @@ def main():
                 st.write(f"**Sortino Ratio:** {sortino:.2f}")
                 st.write(f"**Calmar Ratio:** {calmar:.2f}")
                 st.markdown("### Trade Log")
-                trade_log = backtester.get_trade_log()
-                #error handling
-                if not trade_log.empty:
-                    #making sure all columns are scalars for Streamlit
-                    for col in trade_log.columns:
-                        trade_log[col] = trade_log[col].apply(lambda x: x if not hasattr(x, 'to_list') and not isinstance(x, (pd.Series, list, dict)) else str(x))
+                #only the first chunk of the trade log is shown, the downloads stream the rest
+                preview = next(backtester.iter_trade_log(chunk_size=10000), pd.DataFrame())
+                if len(backtester.trades) > len(preview):
+                    st.caption(f"Showing the first {len(preview):,} of {len(backtester.trades):,} trades")
                 #displaying the trade log
-                st.dataframe(trade_log)
-                #download button, allowing the user to download the trade log as a csv
-                st.download_button(
-                    "📥 Download Trade Log",
-                    trade_log.to_csv(index=False),
-                    "trade_log.csv",
-                    "text/csv"
-                )
+                st.dataframe(preview)
+                #download button for the export picked in the sidebar, streamlit reads the whole payload into memory
+                #so nothing is built unless an export was picked, write_export streams to disk without buffering
+                if params['export_table'] != "None":
+                    if params['export_table'] == "Trade Log":
+                        chunks = backtester.iter_trade_log()
+                    else:
+                        chunks = iter_equity_curve(equity_curve['Equity Curve'])
+                    export_format = params['export_format']
+                    file_name = params['export_table'].lower().replace(' ', '_') + '.' + export_format
+                    st.download_button(
+                        f"📥 Download {params['export_table']} ({export_format})",
+                        ExportStream(stream_export(chunks, export_format)),
+                        file_name,
+                        EXPORT_FORMATS[export_format]
+                    )
         #error handling if the simulation fails
         except Exception as e:
             st.error(f"Something went wrong: {e}")
@@ -131,4 +131,31 @@ def calculate_recovery_factor(equity_curve: Union[List[float], pd.Series]) -> fl
     if max_dd == 0:
         return 0.0
     #calculating the recovery factor
-    return total_return / max_dd 
\ No newline at end of file
+    return total_return / max_dd
+
+#function to calculate the sharpe ratio for many return series at once, one column per series
+def calculate_sharpe_ratio_batch(returns: np.ndarray, risk_free_rate: float = 0.02) -> np.ndarray:
+    #calculating the annual returns and volatility for every column
+    annual_returns = returns.mean(axis=0) * 252
+    annual_volatility = returns.std(axis=0, ddof=1) * np.sqrt(252)
+    #columns with no volatility get a sharpe ratio of 0 like the single series version
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sharpe = (annual_returns - risk_free_rate) / annual_volatility
+    return np.where(annual_volatility == 0, 0.0, sharpe)
+
+#function to calculate the maximum drawdown for many equity curves at once, one column per curve
+def calculate_max_drawdown_batch(equity_curves: np.ndarray) -> np.ndarray:
+    #calculating the running maximum down each column
+    running_max = np.maximum.accumulate(equity_curves, axis=0)
+    #calculating the drawdowns
+    drawdowns = (equity_curves - running_max) / running_max * 100
+    #returning the maximum drawdown of every column
+    return np.abs(drawdowns.min(axis=0))
+
+#function to calculate the cagr for many equity curves at once, one column per curve
+def calculate_cagr_batch(equity_curves: np.ndarray, years: float) -> np.ndarray:
+    #initial and final values of every column
+    initial_value = equity_curves[0]
+    final_value = equity_curves[-1]
+    #calculating the cagr
+    return ((final_value / initial_value) ** (1 / years) - 1) * 100
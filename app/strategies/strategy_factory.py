@@ -1,10 +1,23 @@
 #libraries used for the strategy factory
 #type hinting, code clarity
-from typing import Dict, Type
+from typing import Dict, Optional, Tuple, Type
 #abstract base class for creating interfaces
 from abc import ABC, abstractmethod
 #pandas for data manipulation
 import pandas as pd
+#numpy for the batched signal matrices
+import numpy as np
+
+#the app modules are imported as a package in the tests and from the app folder in streamlit
+try:
+    from app.data.resampler import TimeframeCache
+except ImportError:
+    from data.resampler import TimeframeCache
+
+#signal codes used in the batched signal matrices
+BUY = 1
+SELL = -1
+HOLD = 0
 
 #base class for all trading strategies
 class Strategy(ABC):
@@ -15,6 +28,73 @@ class Strategy(ABC):
         #error handling if the method is not implemented
         pass
 
+    #number of trailing bars needed to carry on generating signals exactly where the last call stopped
+    def lookback(self, **kwargs) -> int:
+        raise NotImplementedError(f"{type(self).__name__} does not support incremental signals")
+
+    #generating signals for new bars only, the state holds the tail of the bars seen so far
+    def generate_signals_incremental(self, data: pd.DataFrame, state: Optional[Dict] = None, **kwargs) -> Tuple[list, Dict]:
+        lookback = self.lookback(**kwargs)
+        #the indicators are recalculated over the tail plus the new bars
+        tail = state['tail'] if state else data.iloc[:0]
+        combined = pd.concat([tail, data])
+        signals = self.generate_signals(combined, **kwargs)[len(tail):]
+        #keeping only the original columns of the newest bars for the next call
+        return signals, {'tail': combined[list(data.columns)].iloc[-lookback:]}
+
+    #generating signals for many price paths at once, rows are bars and columns are paths
+    def generate_signal_matrix(self, prices: np.ndarray, **kwargs) -> np.ndarray:
+        #strategies have to opt in to batched signal generation
+        raise NotImplementedError(f"{type(self).__name__} does not support batched signals")
+
+#helper to keep an indicator in the precision of the prices, so float32 prices give float32 indicators
+def _like_prices(series: pd.Series, data: pd.DataFrame) -> pd.Series:
+    dtype = data['Close'].dtype
+    if np.issubdtype(dtype, np.floating) and dtype.itemsize < 8:
+        return series.astype(dtype)
+    return series
+
+#helper to calculate a rolling mean down each column, the first window - 1 rows are nan like pandas
+def _rolling_mean(prices: np.ndarray, window: int) -> np.ndarray:
+    result = np.full(prices.shape, np.nan)
+    if window <= len(prices):
+        windows = np.lib.stride_tricks.sliding_window_view(prices, window, axis=0)
+        result[window - 1:] = windows.mean(axis=-1)
+    return result
+
+#helper to calculate a rolling sample standard deviation down each column
+def _rolling_std(prices: np.ndarray, window: int) -> np.ndarray:
+    result = np.full(prices.shape, np.nan)
+    if 1 < window <= len(prices):
+        windows = np.lib.stride_tricks.sliding_window_view(prices, window, axis=0)
+        result[window - 1:] = windows.std(axis=-1, ddof=1)
+    return result
+
+#helper to calculate an exponential moving average down each column, same as pandas ewm with adjust=False
+def _ewm_mean(prices: np.ndarray, span: int) -> np.ndarray:
+    alpha = 2 / (span + 1)
+    result = np.empty(prices.shape)
+    result[0] = prices[0]
+    #same recursion as ewm(adjust=False), it runs over the bars but every path is updated at once
+    for i in range(1, len(prices)):
+        result[i] = (1 - alpha) * result[i-1] + alpha * prices[i]
+    return result
+
+#helper to flag the bars where a crosses above b, the first row can never be a cross
+def _cross_above(a, b) -> np.ndarray:
+    a = np.broadcast_to(a, np.broadcast_shapes(np.shape(a), np.shape(b)))
+    b = np.broadcast_to(b, a.shape)
+    crossed = np.zeros(a.shape, dtype=bool)
+    crossed[1:] = (a[1:] > b[1:]) & (a[:-1] <= b[:-1])
+    return crossed
+
+#helper to turn buy and sell masks into a signal matrix, buys win ties like the list based strategies
+def _to_signal_matrix(buy: np.ndarray, sell: np.ndarray, warmup: int) -> np.ndarray:
+    signals = np.where(buy, BUY, np.where(sell, SELL, HOLD)).astype(np.int8)
+    #no signals during the warmup period
+    signals[:warmup] = HOLD
+    return signals
+
 #simple moving average crossover strategy, inherits from strategy
 class SMACrossoverStrategy(Strategy):
     #generating signals for the given price data
@@ -22,8 +102,8 @@ class SMACrossoverStrategy(Strategy):
         short_window = kwargs.get('short_window', 20)
         long_window = kwargs.get('long_window', 50)
         #calculating the moving averages
-        data['SMA_short'] = data['Close'].rolling(window=short_window).mean()
-        data['SMA_long'] = data['Close'].rolling(window=long_window).mean()
+        data['SMA_short'] = _like_prices(data['Close'].rolling(window=short_window).mean(), data)
+        data['SMA_long'] = _like_prices(data['Close'].rolling(window=long_window).mean(), data)
         #list to store the signals
         signals = []
         #loop through the data
@@ -44,6 +124,24 @@ class SMACrossoverStrategy(Strategy):
         #returning the signals
         return signals
 
+    #the long average and the previous bar's value are needed to carry on
+    def lookback(self, **kwargs) -> int:
+        return kwargs.get('long_window', 50) + 1
+
+    #generating signals for a matrix of price paths
+    def generate_signal_matrix(self, prices: np.ndarray, **kwargs) -> np.ndarray:
+        short_window = kwargs.get('short_window', 20)
+        long_window = kwargs.get('long_window', 50)
+        #calculating the moving averages for every path
+        sma_short = _rolling_mean(prices, short_window)
+        sma_long = _rolling_mean(prices, long_window)
+        #buy when the short average crosses above the long one, sell on the reverse
+        return _to_signal_matrix(
+            _cross_above(sma_short, sma_long),
+            _cross_above(sma_long, sma_short),
+            long_window
+        )
+
 #relative strength index strategy
 class RSIStrategy(Strategy):
     #generating signals for the given price data
@@ -56,7 +154,7 @@ class RSIStrategy(Strategy):
         gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
         loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
         rs = gain / loss
-        data['RSI'] = 100 - (100 / (1 + rs))
+        data['RSI'] = _like_prices(100 - (100 / (1 + rs)), data)
         #list to store the signals
         signals = []
         #loop through the data
@@ -75,22 +173,59 @@ class RSIStrategy(Strategy):
         #returning the signals
         return signals
 
+    #the rsi window of price changes and the previous bar's value are needed to carry on
+    def lookback(self, **kwargs) -> int:
+        return kwargs.get('period', 14) + 1
+
+    #generating signals for a matrix of price paths
+    def generate_signal_matrix(self, prices: np.ndarray, **kwargs) -> np.ndarray:
+        period = kwargs.get('period', 14)
+        overbought = kwargs.get('overbought', 70)
+        oversold = kwargs.get('oversold', 30)
+        #calculating the rsi for every path, the first delta counts as zero like the pandas version
+        delta = np.zeros(prices.shape)
+        delta[1:] = np.diff(prices, axis=0)
+        gain = _rolling_mean(np.where(delta > 0, delta, 0), period)
+        loss = _rolling_mean(np.where(delta < 0, -delta, 0), period)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rsi = 100 - (100 / (1 + gain / loss))
+        #buy when the rsi drops below oversold, sell when it rises above overbought
+        return _to_signal_matrix(
+            _cross_above(oversold, rsi),
+            _cross_above(rsi, overbought),
+            period
+        )
+
 class MACDStrategy(Strategy):
     #generating signals for the given price data
     def generate_signals(self, data: pd.DataFrame, **kwargs) -> list:
+        return self.generate_signals_incremental(data, None, **kwargs)[0]
+
+    #generating signals for new bars only, the ema values of the last bar seed the next call
+    def generate_signals_incremental(self, data: pd.DataFrame, state: Optional[Dict] = None, **kwargs) -> Tuple[list, Dict]:
         fast_period = kwargs.get('fast_period', 12)
         slow_period = kwargs.get('slow_period', 26)
         signal_period = kwargs.get('signal_period', 9)
+        close = data['Close']
+        #carrying on from a state puts the last emas in front of the new bars, so the recursion picks up where it stopped
+        offset = 1 if state else 0
+        bars_before = state['bars'] if state else 0
+        if state:
+            close_exp1 = pd.concat([pd.Series([state['exp1']]), close], ignore_index=True)
+            close_exp2 = pd.concat([pd.Series([state['exp2']]), close], ignore_index=True)
+        else:
+            close_exp1 = close_exp2 = close
         #calculating the macd
-        exp1 = data['Close'].ewm(span=fast_period, adjust=False).mean()
-        exp2 = data['Close'].ewm(span=slow_period, adjust=False).mean()
+        exp1 = close_exp1.ewm(span=fast_period, adjust=False).mean()
+        exp2 = close_exp2.ewm(span=slow_period, adjust=False).mean()
         macd = exp1 - exp2
-        signal = macd.ewm(span=signal_period, adjust=False).mean()
+        macd_seeded = pd.concat([pd.Series([state['signal']]), macd.iloc[1:]], ignore_index=True) if state else macd
+        signal = macd_seeded.ewm(span=signal_period, adjust=False).mean()
         #list to store the signals
         signals = []
-        #loop through the data
-        for i in range(len(data)):
-            if i < slow_period:
+        #loop through the new bars
+        for i in range(offset, len(macd)):
+            if bars_before + i - offset < slow_period:
                 signals.append(None)
                 continue
             #if the macd is above the signal, buy
@@ -101,8 +236,30 @@ class MACDStrategy(Strategy):
                 signals.append('sell')
             else:
                 signals.append(None)
-        #returning the signals
-        return signals
+        #returning the signals and the state of the last bar
+        if len(data) == 0:
+            return signals, dict(state or {})
+        return signals, {
+            'exp1': exp1.iloc[-1],
+            'exp2': exp2.iloc[-1],
+            'signal': signal.iloc[-1],
+            'bars': bars_before + len(data)
+        }
+
+    #generating signals for a matrix of price paths
+    def generate_signal_matrix(self, prices: np.ndarray, **kwargs) -> np.ndarray:
+        fast_period = kwargs.get('fast_period', 12)
+        slow_period = kwargs.get('slow_period', 26)
+        signal_period = kwargs.get('signal_period', 9)
+        #calculating the macd for every path
+        macd = _ewm_mean(prices, fast_period) - _ewm_mean(prices, slow_period)
+        signal = _ewm_mean(macd, signal_period)
+        #buy when the macd crosses above the signal line, sell on the reverse
+        return _to_signal_matrix(
+            _cross_above(macd, signal),
+            _cross_above(signal, macd),
+            slow_period
+        )
 
 class BollingerBandsStrategy(Strategy):
     #generating signals for the given price data
@@ -133,12 +290,161 @@ class BollingerBandsStrategy(Strategy):
         #returning the signals
         return signals
 
+    #the band window and the previous bar's value are needed to carry on
+    def lookback(self, **kwargs) -> int:
+        return kwargs.get('window', 20) + 1
+
+    #generating signals for a matrix of price paths
+    def generate_signal_matrix(self, prices: np.ndarray, **kwargs) -> np.ndarray:
+        window = kwargs.get('window', 20)
+        num_std = kwargs.get('num_std', 2)
+        #calculating the bollinger bands for every path
+        rolling_mean = _rolling_mean(prices, window)
+        rolling_std = _rolling_std(prices, window)
+        upper_band = rolling_mean + num_std * rolling_std
+        lower_band = rolling_mean - num_std * rolling_std
+        #buy when the price drops below the lower band, sell when it rises above the upper band
+        return _to_signal_matrix(
+            _cross_above(lower_band, prices),
+            _cross_above(prices, upper_band),
+            window
+        )
+
+#sma crossover entries filtered by the trend of a higher timeframe, e.g. a daily trend filter on hourly bars
+class SMATrendFilterStrategy(SMACrossoverStrategy):
+    #generating signals for the given price data
+    def generate_signals(self, data: pd.DataFrame, **kwargs) -> list:
+        trend_rule = kwargs.get('trend_rule', '1D')
+        trend_window = kwargs.get('trend_window', 20)
+        #a shared cache avoids resampling the base bars again in every strategy call
+        timeframes = kwargs.get('timeframes') or TimeframeCache(data)
+        #calculating the trend on the higher timeframe and lining it up with the base bars
+        trend_bars = timeframes.get(trend_rule)
+        trend_close = timeframes.align(trend_rule, 'Close').reindex(data.index)
+        trend_sma = timeframes.align(trend_rule, trend_bars['Close'].rolling(window=trend_window).mean()).reindex(data.index)
+        data['Trend_SMA'] = _like_prices(trend_sma, data)
+        #entries from the sma crossover on the base bars
+        crossover_kwargs = {k: v for k, v in kwargs.items() if k in ('short_window', 'long_window')}
+        signals = super().generate_signals(data, **crossover_kwargs)
+        #only buying in an uptrend and only selling in a downtrend
+        uptrend = (trend_close > trend_sma).to_numpy()
+        downtrend = (trend_close < trend_sma).to_numpy()
+        for i, signal in enumerate(signals):
+            if (signal == 'buy' and not uptrend[i]) or (signal == 'sell' and not downtrend[i]):
+                signals[i] = None
+        #returning the signals
+        return signals
+
+    #the higher timeframe trend can not be rebuilt from a fixed number of base bars
+    def lookback(self, **kwargs) -> int:
+        raise NotImplementedError(f"{type(self).__name__} does not support incremental signals")
+
+    #simulated paths have no higher timeframe bars, so the unfiltered crossover matrix must not be inherited
+    def generate_signal_matrix(self, prices: np.ndarray, **kwargs) -> np.ndarray:
+        raise NotImplementedError(f"{type(self).__name__} does not support batched signals")
+
+#base class for strategies that rank a whole universe at once, data is a dates x symbols matrix of closes
+class CrossSectionalStrategy(Strategy):
+    #number of bars the scores look back over unless a lookback is given
+    default_lookback = 20
+    #columns of a single ticker frame, these can never be symbols
+    ohlcv_columns = ('Open', 'High', 'Low', 'Close', 'Adj Close', 'Volume')
+
+    #abstract method to score every symbol on every date, higher scores are bought and lower scores are sold
+    @abstractmethod
+    def score(self, prices: pd.DataFrame, lookback: int) -> pd.DataFrame:
+        pass
+
+    #dates the targets are traded on, every rebalance_every bars once the lookback is filled
+    def rebalance_dates(self, prices: pd.DataFrame, **kwargs) -> pd.Series:
+        rebalance_every = kwargs.get('rebalance_every', 21)
+        lookback = kwargs.get('lookback', self.default_lookback)
+        dates = np.arange(len(prices))
+        rebalance = (dates >= lookback) & ((dates - lookback) % rebalance_every == 0)
+        return pd.Series(rebalance, index=prices.index, name='Rebalance')
+
+    #generating the target weights of every symbol on every date
+    def generate_weights(self, prices: pd.DataFrame, **kwargs) -> pd.DataFrame:
+        top_n = kwargs.get('top_n', 3)
+        bottom_n = kwargs.get('bottom_n', 0)
+        lookback = kwargs.get('lookback', self.default_lookback)
+        #error handling if the data is a single ticker instead of a universe of close prices
+        ohlcv = [column for column in prices.columns if column in self.ohlcv_columns]
+        if ohlcv:
+            raise ValueError(
+                f"{type(self).__name__} needs close prices with one column per symbol, "
+                f"got single ticker columns {ohlcv}, run it with PortfolioBacktester"
+            )
+        scores = self.score(prices, lookback).to_numpy(dtype=float)
+        n_dates = len(scores)
+        #ranking every row at once, nan scores sort last and never get a position
+        valid = ~np.isnan(scores)
+        n_valid = valid.sum(axis=1, keepdims=True)
+        ranks = np.argsort(np.argsort(np.where(valid, scores, np.inf), axis=1, kind='stable'), axis=1)
+        #rows without enough symbols to fill both legs stay flat
+        enough = n_valid >= top_n + bottom_n
+        longs = valid & enough & (ranks >= n_valid - top_n)
+        shorts = valid & enough & (ranks < bottom_n)
+        #the long leg gets all the capital when long only, otherwise both legs get half
+        long_weight = (1.0 if bottom_n == 0 else 0.5) / top_n if top_n else 0.0
+        short_weight = 0.5 / bottom_n if bottom_n else 0.0
+        targets = np.where(longs, long_weight, 0.0) - np.where(shorts, short_weight, 0.0)
+        #targets are only traded on rebalance dates and held in between
+        dates = np.arange(n_dates)
+        rebalance = self.rebalance_dates(prices, **kwargs).to_numpy()
+        last_rebalance = np.maximum.accumulate(np.where(rebalance, dates, -1))
+        weights = np.where((last_rebalance >= 0)[:, None], targets[np.maximum(last_rebalance, 0)], 0.0)
+        return pd.DataFrame(weights, index=prices.index, columns=prices.columns)
+
+    #generating signals, these are the target weights on every rebalance date and None otherwise
+    def generate_signals(self, data: pd.DataFrame, **kwargs) -> list:
+        weights = self.generate_weights(data, **kwargs)
+        rebalance = self.rebalance_dates(data, **kwargs).to_numpy()
+        return [weights.iloc[i].to_dict() if rebalance[i] else None for i in range(len(weights))]
+
+#cross sectional momentum, buys the best performers over the lookback and sells the worst
+class CrossSectionalMomentumStrategy(CrossSectionalStrategy):
+    def score(self, prices: pd.DataFrame, lookback: int) -> pd.DataFrame:
+        return prices / prices.shift(lookback) - 1
+
+#cross sectional mean reversion, buys the worst performers over the lookback and sells the best
+class CrossSectionalMeanReversionStrategy(CrossSectionalStrategy):
+    default_lookback = 5
+
+    def score(self, prices: pd.DataFrame, lookback: int) -> pd.DataFrame:
+        return -(prices / prices.shift(lookback) - 1)
+
+#parameter bounds as (min, max, step), shared by the sidebar controls and the optimizer grids
+PARAMETER_RANGES: Dict[str, Dict[str, Tuple[float, float, float]]] = {
+    "SMA Crossover": {
+        "short_window": (1, 100, 5),
+        "long_window": (1, 200, 10)
+    },
+    "RSI Strategy": {
+        "period": (1, 50, 2),
+        "overbought": (50, 100, 5),
+        "oversold": (0, 50, 5)
+    },
+    "MACD Strategy": {
+        "fast_period": (1, 50, 2),
+        "slow_period": (1, 100, 5),
+        "signal_period": (1, 50, 2)
+    },
+    "Bollinger Bands": {
+        "window": (5, 100, 5),
+        "num_std": (1, 4, 1)
+    }
+}
+
 #strategy registry
 STRATEGY_REGISTRY: Dict[str, Type[Strategy]] = {
     "SMA Crossover": SMACrossoverStrategy,
     "RSI Strategy": RSIStrategy,
     "MACD Strategy": MACDStrategy,
-    "Bollinger Bands": BollingerBandsStrategy
+    "Bollinger Bands": BollingerBandsStrategy,
+    "SMA Trend Filter": SMATrendFilterStrategy,
+    "Cross-Sectional Momentum": CrossSectionalMomentumStrategy,
+    "Cross-Sectional Mean Reversion": CrossSectionalMeanReversionStrategy
 }
 
 #function to get a strategy instance by name
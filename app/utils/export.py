@@ -0,0 +1,152 @@
+#libraries used to stream trade logs and equity curves to files
+import io
+from typing import Iterable, Iterator, List, Optional, Union
+import pandas as pd
+
+#pyarrow is only needed for the parquet and arrow exports
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+PYARROW_AVAILABLE = pa is not None
+
+#formats that can be exported and their mime types for downloads
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'parquet': 'application/vnd.apache.parquet',
+    'arrow': 'application/vnd.apache.arrow.stream'
+}
+
+#function to split an equity curve into chunks with the date as a column
+def iter_equity_curve(equity_curve: Union[pd.Series, pd.DataFrame], chunk_size: int = 100000) -> Iterator[pd.DataFrame]:
+    if isinstance(equity_curve, pd.Series):
+        equity_curve = equity_curve.to_frame('Equity Curve')
+    for start in range(0, len(equity_curve), chunk_size):
+        chunk = equity_curve.iloc[start:start + chunk_size]
+        yield chunk.rename_axis('Date').reset_index()
+
+#class that collects the bytes a writer produces so they can be handed out as they arrive
+class _ByteSink:
+    def __init__(self):
+        self._parts: List[bytes] = []
+        self.closed = False
+
+    def write(self, data) -> int:
+        self._parts.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    #function to take everything written since the last call
+    def take(self) -> bytes:
+        data = b''.join(self._parts)
+        self._parts = []
+        return data
+
+#function to stream chunks as csv, the header is only written once
+def stream_csv(chunks: Iterable[pd.DataFrame]) -> Iterator[bytes]:
+    header = True
+    for chunk in chunks:
+        yield chunk.to_csv(index=False, header=header).encode('utf-8')
+        header = False
+
+#function to check that pyarrow is available
+def _require_pyarrow():
+    if not PYARROW_AVAILABLE:
+        raise ImportError("pyarrow is needed for Parquet and Arrow exports, install it with 'pip install pyarrow'")
+
+#function to stream chunks as an arrow ipc stream, one record batch per chunk
+def stream_arrow_ipc(chunks: Iterable[pd.DataFrame]) -> Iterator[bytes]:
+    _require_pyarrow()
+    sink = _ByteSink()
+    writer = None
+    for chunk in chunks:
+        batch = pa.RecordBatch.from_pandas(chunk, preserve_index=False)
+        #the schema comes from the first chunk, the rest have to match it
+        if writer is None:
+            writer = pa.ipc.new_stream(sink, batch.schema)
+        writer.write_batch(batch)
+        yield sink.take()
+    if writer is not None:
+        writer.close()
+        yield sink.take()
+
+#function to stream chunks as parquet, one row group per chunk
+def stream_parquet(chunks: Iterable[pd.DataFrame]) -> Iterator[bytes]:
+    _require_pyarrow()
+    sink = _ByteSink()
+    writer = None
+    for chunk in chunks:
+        table = pa.Table.from_pandas(chunk, preserve_index=False)
+        #the schema comes from the first chunk, the rest have to match it
+        if writer is None:
+            writer = pq.ParquetWriter(sink, table.schema)
+        writer.write_table(table, row_group_size=max(len(chunk), 1))
+        yield sink.take()
+    if writer is not None:
+        writer.close()
+        yield sink.take()
+
+#function to stream chunks in any of the export formats
+def stream_export(chunks: Iterable[pd.DataFrame], export_format: str = 'csv') -> Iterator[bytes]:
+    #error handling if the format is not supported
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format '{export_format}', choose from {list(EXPORT_FORMATS)}")
+    if export_format == 'csv':
+        return stream_csv(chunks)
+    if export_format == 'parquet':
+        return stream_parquet(chunks)
+    return stream_arrow_ipc(chunks)
+
+#function to write chunks straight to a file without building the whole table
+def write_export(chunks: Iterable[pd.DataFrame], path: str, export_format: Optional[str] = None) -> str:
+    #the format defaults to the file extension
+    export_format = export_format or path.rsplit('.', 1)[-1].lower()
+    with open(path, 'wb') as file:
+        for data in stream_export(chunks, export_format):
+            file.write(data)
+    return path
+
+#readable file object over a byte stream, used to serve exports through download buttons
+class ExportStream(io.RawIOBase):
+    def __init__(self, stream: Iterable[bytes]):
+        self._stream = iter(stream)
+        self._buffer = b''
+        self._offset = 0
+        #number of bytes handed out so far
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    #the stream can only be rewound before anything has been read, streamlit seeks to the start before reading
+    def seekable(self) -> bool:
+        return self._position == 0
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if (whence == io.SEEK_SET and offset == self._position) or (whence == io.SEEK_CUR and offset == 0):
+            return self._position
+        raise io.UnsupportedOperation("ExportStream can only seek to its current position")
+
+    def readinto(self, buffer) -> int:
+        #pulling chunks from the stream until there is something to hand out
+        while self._offset >= len(self._buffer):
+            try:
+                self._buffer = next(self._stream)
+                self._offset = 0
+            except StopIteration:
+                return 0
+        size = min(len(buffer), len(self._buffer) - self._offset)
+        buffer[:size] = self._buffer[self._offset:self._offset + size]
+        self._offset += size
+        self._position += size
+        return size
@@ -0,0 +1,19 @@
+import pandas as pd
+import numpy as np
+import pytest
+
+@pytest.fixture
+def ohlcv():
+    # Generate some fake OHLCV data, a random walk with integer volume like the downloaded bars
+    def make(periods=400, seed=0):
+        rng = np.random.default_rng(seed)
+        dates = pd.date_range(start="2023-01-01", periods=periods, freq="D")
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, periods)))
+        return pd.DataFrame({
+            "Open": close * (1 + rng.normal(0, 0.005, periods)),
+            "High": close * 1.01,
+            "Low": close * 0.99,
+            "Close": close,
+            "Volume": rng.integers(1_000_000, 5_000_000_000, periods),
+        }, index=dates)
+    return make
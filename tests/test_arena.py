@@ -0,0 +1,66 @@
+import pandas as pd
+import numpy as np
+import pytest
+from multiprocessing.shared_memory import SharedMemory
+from app.core.arena import PriceArena, attach, run_parallel
+from app.core.backtester import Backtester
+from app.data.market_data import to_price_dtype
+from app.strategies.strategy_factory import get_strategy
+
+def test_attach_is_zero_copy(ohlcv):
+    df = ohlcv()
+    with PriceArena() as arena:
+        handle = arena.add("AAPL", df)
+        assert handle.shape == (len(df), 5)
+        assert handle.start == df.index[0] and handle.end == df.index[-1]
+        with attach(handle) as shared:
+            pd.testing.assert_frame_equal(shared, df, check_freq=False, check_names=False)
+            # Writing through the segment is visible in the attached frame, so nothing was copied
+            segment = SharedMemory(name=handle.names[3])
+            raw = np.ndarray((len(df),), dtype=handle.dtypes[3], buffer=segment.buf)
+            raw[0] = -1.0
+            assert shared["Close"].iloc[0] == -1.0
+            del raw
+            segment.close()
+            del shared
+
+def test_segments_are_unlinked_on_close(ohlcv):
+    arena = PriceArena()
+    handle = arena.add("AAPL", ohlcv())
+    arena.close()
+    for name in handle.names + (handle.index_name,):
+        with pytest.raises(FileNotFoundError):
+            SharedMemory(name=name)
+
+def test_attach_keeps_column_dtypes(ohlcv):
+    # Compact float32 prices next to int64 volume are shared as they are, nothing is upcast
+    df = to_price_dtype(ohlcv(), "float32").astype({"Volume": np.int64})
+    with PriceArena() as arena:
+        handle = arena.add("AAPL", df)
+        assert handle.dtypes == ("<f4", "<f4", "<f4", "<f4", "<i8")
+        with attach(handle) as shared:
+            pd.testing.assert_frame_equal(shared, df, check_freq=False, check_names=False)
+            assert shared["Close"].dtype == np.float32 and shared["Volume"].dtype == np.int64
+            # Every column is still a view of its segment
+            segment = SharedMemory(name=handle.names[4])
+            raw = np.ndarray((len(df),), dtype=np.int64, buffer=segment.buf)
+            raw[0] = -1
+            assert shared["Volume"].iloc[0] == -1
+            del raw
+            segment.close()
+            del shared
+        with pytest.raises(ValueError, match="can not be shared"):
+            arena.add("MSFT", df.assign(Symbol="MSFT"))
+
+def test_run_parallel_matches_serial_backtest(ohlcv):
+    df = ohlcv()
+    jobs = [("AAPL", "SMA Crossover", {"short_window": 5, "long_window": 20}), ("MSFT", "RSI Strategy", {})]
+    with PriceArena() as arena:
+        arena.add("AAPL", df)
+        arena.add("MSFT", df * 1.5)
+        results = run_parallel(arena, jobs, max_workers=2)
+    serial = df.copy()
+    signals = get_strategy("SMA Crossover").generate_signals(serial, short_window=5, long_window=20)
+    expected = Backtester(serial, signals).run()["Equity Curve"].to_numpy()
+    np.testing.assert_allclose(results[0].equity, expected)
+    assert results[1].ticker == "MSFT"
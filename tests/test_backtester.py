@@ -1,4 +1,5 @@
 import pandas as pd
+import pytest
 import numpy as np
 from app.core.backtester import Backtester
 
@@ -14,4 +15,48 @@ def test_backtester_runs():
     # Should return a DataFrame with the same length as input
     assert not equity_curve.empty
     assert len(equity_curve) == len(df)
-    # TODO: Add more detailed tests for PnL, trade log, etc. 
\ No newline at end of file
+    # TODO: Add more detailed tests for PnL, trade log, etc. 
+
+def _bracket_data():
+    # Long entry at 100 on the first bar, the market then drifts down through a 5% stop
+    dates = pd.date_range(start="2023-01-01", periods=6, freq="D")
+    close = [100, 101, 99, 97, 94, 96]
+    df = pd.DataFrame({
+        "Open": [100, 100.5, 100, 98, 96, 95],
+        "High": [101, 102, 100.5, 98.5, 96, 97],
+        "Low": [99, 100, 98, 96.5, 93, 94],
+        "Close": close,
+    }, index=dates)
+    return df
+
+def test_stop_loss_fills_intrabar():
+    df = _bracket_data()
+    signals = [None, "buy", None, None, None, None]
+    backtester = Backtester(df, signals, stop_loss=0.05, slippage=0.001)
+    backtester.run()
+    trade = backtester.trades[0]
+    # Entry at 101, stop at 95.95 is touched by the 93 low on the fifth bar
+    assert trade.exit_reason == "stop_loss"
+    assert trade.exit_date == df.index[4]
+    assert trade.exit_price == pytest.approx(101 * 0.95 * 0.999)
+
+def test_trailing_stop_and_take_profit():
+    df = _bracket_data()
+    signals = [None, "buy", None, None, None, None]
+    # Highs after the entry never beat 101, so a 3% trail stays at 97.97 until the 96.5 low on the fourth bar
+    backtester = Backtester(df, signals, trailing_stop=0.03)
+    backtester.run()
+    assert backtester.trades[0].exit_reason == "trailing_stop"
+    assert backtester.trades[0].exit_date == df.index[3]
+    assert backtester.trades[0].exit_price == pytest.approx(101 * 0.97)
+    # A short from the third bar hits a 4% target at 95.04, the fifth bar opens above it so it fills at the target
+    signals = [None, None, "sell", None, None, None]
+    backtester = Backtester(df, signals, take_profit=0.04)
+    backtester.run()
+    assert backtester.trades[0].exit_reason == "take_profit"
+    assert backtester.trades[0].exit_price == pytest.approx(99 * 0.96)
+
+def test_brackets_need_high_low():
+    df = pd.DataFrame({"Close": [1.0, 2.0]}, index=pd.date_range("2023-01-01", periods=2))
+    with pytest.raises(ValueError):
+        Backtester(df, [None, None], stop_loss=0.05)
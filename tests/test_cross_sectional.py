@@ -0,0 +1,92 @@
+import pandas as pd
+import numpy as np
+import pytest
+from app.core.backtester import PortfolioBacktester
+from app.strategies.strategy_factory import get_strategy, CrossSectionalMomentumStrategy
+
+def _universe(periods=120, seed=0):
+    # Five symbols with different drifts, so momentum ranks are stable
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(start="2023-01-01", periods=periods, freq="D")
+    drifts = np.array([-0.004, -0.002, 0.0, 0.002, 0.004])
+    returns = drifts + rng.normal(0, 0.001, (periods, 5))
+    prices = 100 * np.exp(np.cumsum(returns, axis=0))
+    return pd.DataFrame(prices, index=dates, columns=["A", "B", "C", "D", "E"])
+
+def test_momentum_weights_long_short():
+    prices = _universe()
+    weights = CrossSectionalMomentumStrategy().generate_weights(prices, lookback=20, top_n=2, bottom_n=1, rebalance_every=10)
+    # Nothing is held before the first rebalance
+    assert (weights.iloc[:20] == 0).all().all()
+    # Best two symbols are long half the capital, the worst is short the other half
+    row = weights.iloc[-1]
+    assert row["E"] == pytest.approx(0.25) and row["D"] == pytest.approx(0.25)
+    assert row["A"] == pytest.approx(-0.5)
+    assert row["B"] == 0 and row["C"] == 0
+    # Weights only change on rebalance dates
+    changes = weights.diff().abs().sum(axis=1)
+    assert set(np.flatnonzero(changes.to_numpy() > 0)) <= set(range(20, 120, 10))
+
+def test_strategies_are_registered():
+    prices = _universe()
+    for name in ("Cross-Sectional Momentum", "Cross-Sectional Mean Reversion"):
+        signals = get_strategy(name).generate_signals(prices)
+        assert len(signals) == len(prices)
+        assert any(isinstance(signal, dict) for signal in signals)
+
+def test_portfolio_backtester_charges_turnover():
+    prices = _universe()
+    strategy = CrossSectionalMomentumStrategy()
+    weights = strategy.generate_weights(prices, lookback=20, top_n=1, rebalance_every=10)
+    rebalance = strategy.rebalance_dates(prices, lookback=20, rebalance_every=10)
+    result = PortfolioBacktester(prices, weights, commission=0.001, rebalance=rebalance).run()
+    free = PortfolioBacktester(prices, weights, commission=0.0, rebalance=rebalance).run()
+    # The first rebalance buys the whole book
+    assert result["Turnover"].iloc[20] == pytest.approx(1.0)
+    assert result["Equity Curve"].iloc[-1] < free["Equity Curve"].iloc[-1]
+    # Holding the best symbol should make money
+    assert free["Equity Curve"].iloc[-1] > 100000
+
+def test_strategies_reject_single_ticker_data():
+    # Columns of an OHLCV frame are not symbols, ranking them would hand the Backtester weight dicts
+    ohlcv = _universe().set_axis(["Open", "High", "Low", "Close", "Volume"], axis=1)
+    for name in ("Cross-Sectional Momentum", "Cross-Sectional Mean Reversion"):
+        with pytest.raises(ValueError, match="one column per symbol"):
+            get_strategy(name).generate_signals(ohlcv)
+
+def test_portfolio_backtester_lets_holdings_drift():
+    prices = _universe()[["A", "E"]]
+    weights = pd.DataFrame(0.5, index=prices.index, columns=prices.columns)
+    rebalance = np.zeros(len(prices), dtype=bool)
+    rebalance[60] = True
+    result = PortfolioBacktester(prices, weights, commission=0.0, rebalance=rebalance).run()
+    # Between rebalances the book is just held
+    buy_and_hold = 100000 * (0.5 * prices / prices.iloc[0]).sum(axis=1)
+    assert np.allclose(result["Equity Curve"].iloc[:61], buy_and_hold.iloc[:61])
+    assert result["Turnover"].iloc[0] == pytest.approx(1.0)
+    assert (result["Turnover"].iloc[1:60] == 0).all()
+    # The rebalance trades the drifted holdings back to the unchanged targets
+    value = 0.5 * prices.iloc[60] / prices.iloc[0]
+    drifted = value / value.sum()
+    assert result["Turnover"].iloc[60] == pytest.approx(abs(drifted["A"] - 0.5) + abs(drifted["E"] - 0.5))
+    assert result["Turnover"].iloc[60] > 0
+    # After it the book drifts from 50 / 50 again
+    rebought = buy_and_hold.iloc[60] * (0.5 * prices.iloc[60:] / prices.iloc[60]).sum(axis=1)
+    assert np.allclose(result["Equity Curve"].iloc[60:], rebought)
+
+def test_portfolio_backtester_rebalances_a_stable_book():
+    # The same two symbols win every time, the book is still reset on every rebalance date
+    prices = _universe(periods=250)
+    strategy = CrossSectionalMomentumStrategy()
+    weights = strategy.generate_weights(prices, lookback=20, top_n=2, rebalance_every=21)
+    rebalance = strategy.rebalance_dates(prices, lookback=20, rebalance_every=21)
+    assert (weights.iloc[20:].nunique() == 1).all()
+    result = PortfolioBacktester(prices, weights, commission=0.001, rebalance=rebalance).run()
+    traded = result["Turnover"].to_numpy() > 0
+    assert (traded == rebalance.to_numpy()).all()
+    assert traded.sum() == len(range(20, 250, 21))
+    # Commission is charged on every rebalance, not just the first buy
+    drift_only = PortfolioBacktester(prices, weights, commission=0.001).run()
+    assert result["Turnover"].sum() > drift_only["Turnover"].sum()
+    signals = strategy.generate_signals(prices, lookback=20, top_n=2, rebalance_every=21)
+    assert [i for i, signal in enumerate(signals) if signal is not None] == list(range(20, 250, 21))
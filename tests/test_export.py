@@ -0,0 +1,65 @@
+import io
+import pandas as pd
+import numpy as np
+import pytest
+from app.core.backtester import Backtester
+from app.utils.export import ExportStream, iter_equity_curve, stream_export, write_export
+
+def _backtester():
+    # Alternating signals give plenty of trades
+    dates = pd.date_range(start="2023-01-01", periods=50, freq="D")
+    df = pd.DataFrame({"Close": np.linspace(100, 120, 50)}, index=dates)
+    signals = ["buy" if i % 2 == 0 else "sell" for i in range(50)]
+    backtester = Backtester(df, signals)
+    backtester.run()
+    return backtester
+
+def test_trade_log_chunks_are_typed():
+    backtester = _backtester()
+    chunks = list(backtester.iter_trade_log(chunk_size=10))
+    assert len(chunks) == -(-len(backtester.trades) // 10)
+    log = backtester.get_trade_log()
+    pd.testing.assert_frame_equal(pd.concat(chunks), log)
+    assert log["Entry Date"].dtype.kind == "M"
+    assert log["PnL"].dtype == np.float64
+    assert log["Trade Duration"].dtype == "Int64"
+
+def test_csv_stream_matches_to_csv():
+    backtester = _backtester()
+    streamed = ExportStream(stream_export(backtester.iter_trade_log(chunk_size=7), "csv")).read()
+    expected = backtester.get_trade_log().to_csv(index=False).encode("utf-8")
+    assert streamed == expected
+
+@pytest.mark.parametrize("export_format", ["parquet", "arrow"])
+def test_columnar_exports_round_trip(tmp_path, export_format):
+    pytest.importorskip("pyarrow")
+    backtester = _backtester()
+    log = backtester.get_trade_log()
+    path = write_export(backtester.iter_trade_log(chunk_size=7), str(tmp_path / f"trades.{export_format}"))
+    if export_format == "parquet":
+        import pyarrow.parquet as pq
+        assert pq.ParquetFile(path).num_row_groups == -(-len(log) // 7)
+        result = pd.read_parquet(path)
+    else:
+        import pyarrow as pa
+        with pa.ipc.open_stream(path) as reader:
+            result = reader.read_pandas()
+    pd.testing.assert_frame_equal(result, log, check_dtype=False)
+
+def test_equity_curve_chunks():
+    backtester = _backtester()
+    chunks = list(iter_equity_curve(backtester.equity_curve, chunk_size=20))
+    assert [len(chunk) for chunk in chunks] == [20, 20, 10]
+    assert list(chunks[0].columns) == ["Date", "Equity Curve"]
+    with pytest.raises(ValueError):
+        stream_export(chunks, "xlsx")
+
+def test_export_stream_rewinds_before_reading():
+    # Streamlit download buttons seek to the start before reading
+    stream = ExportStream(iter([b"abc", b"def"]))
+    assert stream.seekable()
+    assert stream.seek(0) == 0
+    assert stream.read() == b"abcdef"
+    assert stream.tell() == 6
+    with pytest.raises(io.UnsupportedOperation):
+        stream.seek(0)
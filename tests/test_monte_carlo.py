@@ -0,0 +1,65 @@
+import pandas as pd
+import numpy as np
+import pytest
+from app.core.backtester import Backtester
+from app.core.monte_carlo import simulate_price_paths, run_batch_backtest, run_monte_carlo
+from app.metrics.performance import calculate_sharpe_ratio, calculate_max_drawdown, calculate_cagr
+from app.strategies.strategy_factory import get_strategy, STRATEGY_REGISTRY
+
+def _random_prices(n=300, seed=0):
+    rng = np.random.default_rng(seed)
+    return 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+
+@pytest.mark.parametrize("name", list(STRATEGY_REGISTRY))
+def test_signal_matrix_matches_list_signals(name):
+    # Every column of the batched signals should match the single path signals
+    prices = np.column_stack([_random_prices(seed=s) for s in range(3)])
+    strategy = get_strategy(name)
+    try:
+        matrix = strategy.generate_signal_matrix(prices)
+    except NotImplementedError:
+        pytest.skip(f"{name} does not support batched signals")
+    for j in range(prices.shape[1]):
+        df = pd.DataFrame({"Close": prices[:, j]})
+        signals = strategy.generate_signals(df)
+        expected = [1 if s == "buy" else -1 if s == "sell" else 0 for s in signals]
+        assert matrix[:, j].tolist() == expected
+
+def test_batch_backtest_matches_backtester():
+    # The batch engine should reproduce the backtester equity for every path
+    prices = np.column_stack([_random_prices(seed=s) for s in range(3)])
+    strategy = get_strategy("SMA Crossover")
+    signals = strategy.generate_signal_matrix(prices, short_window=5, long_window=20)
+    equity = run_batch_backtest(prices, signals)
+    for j in range(prices.shape[1]):
+        df = pd.DataFrame({"Close": prices[:, j]}, index=pd.date_range("2023-01-01", periods=len(prices)))
+        labels = ["buy" if s == 1 else "sell" if s == -1 else None for s in signals[:, j]]
+        expected = Backtester(df, labels).run()["Equity Curve"].to_numpy()
+        np.testing.assert_allclose(equity[:, j], expected, rtol=1e-12)
+
+def test_monte_carlo_metric_distributions():
+    df = pd.DataFrame({"Close": _random_prices()})
+    result = run_monte_carlo(df, "SMA Crossover", n_paths=50, seed=1, short_window=5, long_window=20)
+    assert result.prices.shape == (len(df), 50)
+    assert list(result.summary.index) == ["P5", "P25", "P50", "P75", "P95"]
+    # Batched metrics should agree with the single series metrics
+    curve = pd.Series(result.equity[:, 0])
+    years = len(df) / 252
+    assert result.metrics["Sharpe Ratio"].iloc[0] == pytest.approx(calculate_sharpe_ratio(curve.pct_change().dropna()))
+    assert result.metrics["Max Drawdown"].iloc[0] == pytest.approx(calculate_max_drawdown(curve))
+    assert result.metrics["CAGR"].iloc[0] == pytest.approx(calculate_cagr(curve, years))
+
+def test_simulate_price_paths_methods():
+    close = _random_prices()
+    for method in ("bootstrap", "gbm"):
+        paths = simulate_price_paths(close, n_paths=10, method=method, seed=0)
+        assert paths.shape == (len(close), 10)
+        assert np.all(paths[0] == close[0])
+    with pytest.raises(ValueError):
+        simulate_price_paths(close, method="unknown")
+
+def test_monte_carlo_rejects_unsupported_strategy():
+    # The trend filter would otherwise be simulated as a plain SMA crossover
+    df = pd.DataFrame({"Close": _random_prices()})
+    with pytest.raises(NotImplementedError):
+        run_monte_carlo(df, "SMA Trend Filter", n_paths=5, seed=0)
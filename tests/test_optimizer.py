@@ -0,0 +1,75 @@
+import pandas as pd
+import numpy as np
+import pytest
+from app.core.optimizer import PARAMETER_RANGES, build_parameter_grid, evaluate_parameters, successive_halving
+
+def _prices(periods=400, seed=0):
+    # Generate some fake trending price data
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(start="2023-01-01", periods=periods, freq="D")
+    close = 100 + np.cumsum(rng.normal(0.05, 1, periods)) + 5 * np.sin(np.arange(periods) / 10)
+    return pd.DataFrame({"Close": close}, index=dates)
+
+def test_parameter_grid_is_valid():
+    grid = build_parameter_grid("SMA Crossover")
+    assert grid
+    assert all(params["short_window"] < params["long_window"] for params in grid)
+    assert all(isinstance(params["short_window"], int) for params in grid)
+    # The grid spans the same bounds as the sidebar controls
+    for name, (low, high, _) in PARAMETER_RANGES["SMA Crossover"].items():
+        assert min(params[name] for params in grid) >= low
+        assert max(params[name] for params in grid) == high
+    assert min(params["short_window"] for params in grid) == 1
+    with pytest.raises(ValueError):
+        build_parameter_grid("Unknown")
+
+def test_successive_halving_saves_evaluations():
+    df = _prices()
+    ranges = {"short_window": (2, 20, 2), "long_window": (10, 40, 10)}
+    candidates = build_parameter_grid("SMA Crossover", ranges)
+    result = successive_halving(df, "SMA Crossover", candidates, eta=3, min_fraction=1 / 9)
+    # Far fewer bars are backtested than running the whole grid on the full history
+    assert result.full_grid_evaluations == len(candidates)
+    assert result.bars_evaluated < result.full_grid_bars
+    assert 0 < result.savings < 1
+    # The winner was scored on the full history
+    final = result.history[result.history["Fraction"] == 1.0]
+    assert result.best_score == final["Score"].max()
+    assert result.best_score == pytest.approx(evaluate_parameters(df, "SMA Crossover", result.best_params))
+    assert result.best_params in candidates
+
+def test_successive_halving_keeps_long_window_candidates():
+    # A slow cycle under noise, the best settings have long windows that need most of a short prefix to warm up
+    rng = np.random.default_rng(0)
+    t = np.arange(504)
+    close = 100 + 30 * np.sin(t / 50) + 6 * np.sin(t / 12) + rng.normal(0, 5, 504)
+    df = pd.DataFrame({"Close": close}, index=pd.date_range(start="2023-01-01", periods=504, freq="D"))
+    candidates = build_parameter_grid("SMA Crossover", {"short_window": (5, 20, 5), "long_window": (20, 120, 20)})
+    scores = [evaluate_parameters(df, "SMA Crossover", params) for params in candidates]
+    assert candidates[int(np.argmax(scores))]["long_window"] >= 100
+    result = successive_halving(df, "SMA Crossover", candidates)
+    # Every candidate had enough bars after its warmup to trade in the first round
+    first_round = result.history[result.history["Round"] == 0]
+    assert len(first_round) == len(candidates)
+    assert (first_round["Score"] != 0).all()
+    assert result.best_params["long_window"] >= 80
+    assert result.best_score >= 0.9 * max(scores)
+
+def test_successive_halving_keeps_tied_candidates():
+    df = _prices()
+    # Duplicated candidates always tie, so a cut can not fall between them
+    candidates = [{"short_window": 5, "long_window": 20}] * 4 + [{"short_window": 10, "long_window": 40}]
+    result = successive_halving(df, "SMA Crossover", candidates, eta=3)
+    assert result.history.groupby("Round").size().iloc[-1] >= 4
+
+def test_successive_halving_does_not_cut_twice_on_one_prefix():
+    df = _prices()
+    candidates = build_parameter_grid("SMA Crossover", {"short_window": (5, 20, 5), "long_window": (20, 120, 20)})
+    result = successive_halving(df, "SMA Crossover", candidates, eta=3, min_fraction=1 / 9)
+    # The first two rounds are stretched to the same warmup-sized prefix, so only one cut is made on it
+    bars = result.history.groupby("Round")["Bars"].first()
+    assert bars.is_monotonic_increasing and bars.is_unique
+    assert bars.iloc[0] == 2 * 121 and bars.iloc[-1] == len(df)
+    sizes = result.history.groupby("Round").size()
+    assert sizes.iloc[1] >= len(candidates) / 3
+    assert result.bars_evaluated == result.history["Bars"].sum()
@@ -0,0 +1,48 @@
+import pandas as pd
+import numpy as np
+import pytest
+from app.core.backtester import Backtester, encode_signals
+from app.core.precision import compare_precision, run_with_precision
+from app.data.market_data import to_price_dtype
+from app.strategies.strategy_factory import SMACrossoverStrategy
+
+def test_float32_pipeline_dtypes(ohlcv):
+    df = to_price_dtype(ohlcv())
+    assert df["Close"].dtype == np.float32
+    # Volume keeps its integer dtype
+    assert df["Volume"].dtype == np.int64
+    signals = SMACrossoverStrategy().generate_signals(df, short_window=5, long_window=20)
+    assert df["SMA_short"].dtype == np.float32
+    backtester = Backtester(df, encode_signals(signals), dtype="float32")
+    equity = backtester.run()
+    assert equity["Equity Curve"].dtype == np.float32
+    assert backtester.positions.dtype == np.int8
+    # Cash is still tracked in float64
+    assert isinstance(backtester.current_capital, float)
+
+def test_int8_signals_match_string_signals(ohlcv):
+    df = ohlcv()
+    signals = SMACrossoverStrategy().generate_signals(df, short_window=5, long_window=20)
+    codes = encode_signals(signals)
+    assert codes.dtype == np.int8
+    expected = Backtester(df, signals).run()
+    result = Backtester(df, codes).run()
+    pd.testing.assert_frame_equal(result, expected)
+
+def test_encode_signals_maps_unknown_values_to_hold():
+    # Dicts are unhashable and nan has no int8 value, both are holds
+    codes = encode_signals(["buy", None, {"A": 0.5}, "sell", "hold"])
+    assert codes.tolist() == [1, 0, 0, -1, 0]
+    codes = encode_signals(np.array([1.0, np.nan, -1.0, 0.0]))
+    assert codes.dtype == np.int8
+    assert codes.tolist() == [1, 0, -1, 0]
+
+def test_precision_report(ohlcv):
+    df = ohlcv()
+    report = compare_precision(df, "SMA Crossover", {"short_window": 5, "long_window": 20})
+    assert list(report.columns) == ["float64", "float32", "Abs Diff", "Rel Diff %"]
+    # Float32 runs use less memory and stay close to the float64 metrics
+    assert report.loc["Memory (bytes)", "float32"] < report.loc["Memory (bytes)", "float64"]
+    assert report.loc["Total Return", "Abs Diff"] < 0.1
+    assert report.loc["Final Equity", "Rel Diff %"] < 0.01
+    assert run_with_precision(df, "SMA Crossover", "float32")["equity"].dtype == np.float32
@@ -0,0 +1,59 @@
+import pandas as pd
+import numpy as np
+from app.data.resampler import TimeframeCache
+from app.strategies.strategy_factory import SMATrendFilterStrategy
+
+def _hourly_bars(periods=24 * 10, seed=0):
+    # Generate some fake hourly OHLCV data
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(start="2023-01-02", periods=periods, freq="h")
+    close = 100 + np.cumsum(rng.normal(0, 0.5, periods))
+    return pd.DataFrame({
+        "Open": close + rng.normal(0, 0.1, periods),
+        "High": close + 1,
+        "Low": close - 1,
+        "Close": close,
+        "Volume": rng.integers(100, 1000, periods),
+    }, index=dates)
+
+def test_daily_bars_and_no_lookahead():
+    df = _hourly_bars()
+    cache = TimeframeCache(df)
+    daily = cache.get("1D")
+    assert len(daily) == 10
+    assert daily["High"].iloc[0] == df["High"].iloc[:24].max()
+    assert daily["Volume"].iloc[0] == df["Volume"].iloc[:24].sum()
+    # Hourly bars only see the previous day's close
+    aligned = cache.align("1D")
+    assert aligned.iloc[:24].isna().all()
+    assert (aligned.iloc[24:48] == df["Close"].iloc[23]).all()
+    # The aggregate is cached
+    assert cache.get("1D") is daily
+
+def test_append_matches_full_resample():
+    df = _hourly_bars()
+    cache = TimeframeCache(df.iloc[:100])
+    cache.get("1D")
+    cache.get("4h")
+    cache.append(df.iloc[100:150])
+    cache.append(df.iloc[150:])
+    full = TimeframeCache(df)
+    for rule in ("1D", "4h"):
+        pd.testing.assert_frame_equal(cache.get(rule), full.get(rule))
+        pd.testing.assert_series_equal(cache.align(rule), full.align(rule))
+
+def test_trend_filter_uses_shared_cache():
+    df = _hourly_bars(periods=24 * 30)
+    cache = TimeframeCache(df)
+    signals = SMATrendFilterStrategy().generate_signals(
+        df, short_window=5, long_window=20, trend_rule="1D", trend_window=5, timeframes=cache
+    )
+    assert len(signals) == len(df)
+    # Buys only happen when the previous daily close is above its moving average
+    trend = df["Trend_SMA"]
+    prev_close = cache.align("1D")
+    for signal, close, sma in zip(signals, prev_close, trend):
+        if signal == "buy":
+            assert close > sma
+        elif signal == "sell":
+            assert close < sma
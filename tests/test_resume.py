@@ -0,0 +1,75 @@
+import pandas as pd
+import pytest
+from app.core.backtester import Backtester
+from app.strategies.strategy_factory import get_strategy
+
+def _full_and_resumed(df, name, params, splits, **backtest_kwargs):
+    strategy = get_strategy(name)
+    full_signals = strategy.generate_signals(df.copy(), **params)
+    full = Backtester(df, full_signals, **backtest_kwargs)
+    full_equity = full.run()["Equity Curve"]
+    # Run the same history in segments, each one carrying on from the previous checkpoint
+    checkpoint, state = None, None
+    equity, trades, signals = [], [], []
+    for start, end in zip([0] + splits, splits + [len(df)]):
+        segment = df.iloc[start:end]
+        segment_signals, state = strategy.generate_signals_incremental(segment, state, **params)
+        backtester = Backtester(segment, segment_signals, checkpoint=checkpoint, **backtest_kwargs)
+        equity.append(backtester.run()["Equity Curve"])
+        previous_offset = checkpoint.trade_offset if checkpoint else 0
+        checkpoint = backtester.checkpoint(state)
+        # Only the trades before the final forced close belong to the ledger
+        trades.extend(backtester.trades[:checkpoint.trade_offset - previous_offset] if end < len(df) else backtester.trades)
+        signals.extend(segment_signals)
+    return full, full_equity, full_signals, pd.concat(equity), trades, signals
+
+@pytest.mark.parametrize("name, params", [
+    ("SMA Crossover", {"short_window": 5, "long_window": 20}),
+    ("RSI Strategy", {"period": 10, "overbought": 60, "oversold": 40}),
+    ("MACD Strategy", {}),
+    ("Bollinger Bands", {"window": 15, "num_std": 1}),
+])
+def test_resumed_run_matches_full_run(name, params, ohlcv):
+    full, full_equity, full_signals, equity, trades, signals = _full_and_resumed(ohlcv(), name, params, [150, 151, 300])
+    assert signals == full_signals
+    pd.testing.assert_series_equal(equity, full_equity)
+    assert trades == full.trades
+
+def test_resumed_run_with_brackets_matches_full_run(ohlcv):
+    params = {"short_window": 5, "long_window": 20}
+    full, full_equity, _, equity, trades, _ = _full_and_resumed(
+        ohlcv(), "SMA Crossover", params, [120, 250], stop_loss=0.03, trailing_stop=0.04, take_profit=0.08
+    )
+    pd.testing.assert_series_equal(equity, full_equity)
+    assert trades == full.trades
+
+def test_checkpoint_rejects_overlapping_bars(ohlcv):
+    df = ohlcv(periods=50)
+    backtester = Backtester(df, [None] * 50)
+    with pytest.raises(ValueError):
+        backtester.checkpoint()
+    backtester.run()
+    checkpoint = backtester.checkpoint()
+    assert checkpoint.bars_processed == 50
+    with pytest.raises(ValueError):
+        Backtester(df.iloc[40:], [None] * 10, checkpoint=checkpoint)
+
+def test_resume_with_no_new_bars(ohlcv):
+    df = ohlcv(periods=100)
+    strategy = get_strategy("SMA Crossover")
+    signals, state = strategy.generate_signals_incremental(df, None, short_window=5, long_window=20)
+    backtester = Backtester(df, signals, stop_loss=0.05)
+    backtester.run()
+    checkpoint = backtester.checkpoint(state)
+    assert checkpoint.current_position is not None
+    # A holiday with no new bars leaves the state untouched
+    empty = df.iloc[:0]
+    new_signals, new_state = strategy.generate_signals_incremental(empty, checkpoint.indicator_state, short_window=5, long_window=20)
+    assert new_signals == []
+    resumed = Backtester(empty, new_signals, checkpoint=checkpoint, stop_loss=0.05)
+    assert resumed.run().empty
+    assert resumed.trades == []
+    after = resumed.checkpoint(new_state)
+    assert after.current_position == checkpoint.current_position
+    assert after.bars_processed == checkpoint.bars_processed
+    assert after.last_equity == checkpoint.last_equity